@@ -0,0 +1,84 @@
+"""
+Benchmark for `Protocol.add_many()` on a large screen of conditions.
+
+A design-of-experiments style screen (every combination of flow rates for a set
+of pumps, one condition after another) is added to a protocol by calling
+`Protocol.add()` for each procedure, and with `add_many()` from a list of tuples
+and from a pandas DataFrame.
+
+Usage:
+
+    python benchmarks/bench_add_many.py
+"""
+
+import itertools
+import time
+import warnings
+
+import pandas as pd
+
+import mechwolf as mw
+
+N_PUMPS = 4
+RATES = [f"{rate} mL/min" for rate in range(1, 11)]  # 10 ** N_PUMPS conditions
+CONDITION_DURATION = 60  # seconds
+
+
+def build_apparatus() -> mw.Apparatus:
+    A = mw.Apparatus()
+    tube = mw.Tube(length="1 foot", ID="1/16 in", OD="1/8 in", material="PFA")
+    pumps = [mw.DummyPump(name=f"pump_{i}") for i in range(N_PUMPS)]
+    for from_pump, to_pump in zip(pumps, pumps[1:]):
+        A.add(from_pump, to_pump, tube)
+    return A
+
+
+def screen(A: mw.Apparatus):
+    """Yields a (component, start, stop, params) row per pump per condition."""
+    pumps = A[mw.DummyPump]
+    conditions = itertools.product(RATES, repeat=len(pumps))
+    for i, rates in enumerate(conditions):
+        start, stop = i * CONDITION_DURATION, (i + 1) * CONDITION_DURATION
+        for pump, rate in zip(pumps, rates):
+            yield pump, start, stop, {"rate": rate}
+
+
+def add_each(P: mw.Protocol, rows):
+    for component, start, stop, params in rows:
+        P.add(component, start=f"{start} s", stop=f"{stop} s", **params)
+
+
+def main():
+    A = build_apparatus()
+    rows = list(screen(A))
+    frame = pd.DataFrame(
+        dict(
+            component=[row[0].name for row in rows],
+            start=[row[1] for row in rows],
+            stop=[row[2] for row in rows],
+            rate=[row[3]["rate"] for row in rows],
+        )
+    )
+
+    print(f"{len(rows)} procedures\n")
+    print(f"{'method':>22} {'add (s)':>8} {'us/procedure':>13}")
+    results = []
+    for method, add in [
+        ("add()", lambda P: add_each(P, rows)),
+        ("add_many(tuples)", lambda P: P.add_many(rows)),
+        ("add_many(DataFrame)", lambda P: P.add_many(frame)),
+    ]:
+        P = mw.Protocol(A)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            start = time.perf_counter()
+            add(P)
+            elapsed = time.perf_counter() - start
+        results.append(P.procedures)
+        print(f"{method:>22} {elapsed:>8.3f} {elapsed / len(rows) * 1e6:>13.2f}")
+
+    assert all(procedures == results[0] for procedures in results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Benchmark for building large apparatuses and looking up their components.
+
+Each apparatus connects a bank of vessels through a pump to a bank of
+collection vessels using `Apparatus.add()` with lists, then looks up every
+component by name and queries the components by type. Time per component
+should stay roughly flat as the apparatus grows.
+
+Usage:
+
+    python benchmarks/bench_apparatus_build.py
+"""
+
+import time
+
+import mechwolf as mw
+
+SIZES = [100, 1_000, 2_000]
+
+
+def build_apparatus(n_components: int) -> mw.Apparatus:
+    A = mw.Apparatus()
+    tube = mw.Tube(length="1 foot", ID="1/16 in", OD="1/8 in", material="PFA")
+    pump = mw.DummyPump(name="pump")
+    sources = [
+        mw.Vessel(f"source {i}", name=f"source_{i}") for i in range(n_components // 2)
+    ]
+    sinks = [mw.Vessel(f"sink {i}", name=f"sink_{i}") for i in range(n_components // 2)]
+    A.add(sources, pump, tube)
+    A.add(pump, sinks, tube)
+    return A
+
+
+def main():
+    print(
+        f"{'components':>11} {'build (s)':>10} {'lookups (s)':>12} {'us/component':>14}"
+    )
+    for size in SIZES:
+        start = time.perf_counter()
+        A = build_apparatus(size)
+        built = time.perf_counter()
+        for component in list(A.components):
+            assert A[component.name] is component
+        A[mw.Vessel], A[mw.Pump], A[mw.Sensor]
+        looked_up = time.perf_counter()
+        print(
+            f"{size:>11} {built - start:>10.3f} {looked_up - built:>12.3f} "
+            f"{(looked_up - start) / size * 1e6:>14.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
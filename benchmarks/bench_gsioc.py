@@ -0,0 +1,62 @@
+"""
+Benchmark for the latency of GSIOC commands.
+
+Commands are sent to a simulated GSIOC device (the tests' `LoopbackSerial`,
+patched in place of `aioserial.AioSerial`) that takes `LATENCY` seconds to answer each
+write, roughly a round trip at 19200 baud. Each kind of command is timed with
+the unit already selected and with a fresh handshake before every command (as
+every command used to do). Buffered commands are also timed in block mode and
+one character at a time.
+
+Usage (from the root of the repository, so that the tests can be imported):
+
+    python -m benchmarks.bench_gsioc
+"""
+
+import asyncio
+import time
+
+import aioserial
+
+from mechwolf.components.contrib import gsioc
+from tests.gsioc_loopback import LoopbackSerial
+
+LATENCY = 0.001
+N_COMMANDS = 50
+
+
+def time_commands(interface, send, handshake_every_time: bool) -> float:
+    start = time.perf_counter()
+    for i in range(N_COMMANDS):
+        if handshake_every_time:
+            interface._bus.selected = None
+        send(interface, i)
+    return (time.perf_counter() - start) / N_COMMANDS
+
+
+def main():
+    aioserial.AioSerial = LoopbackSerial
+    LoopbackSerial.latency = LATENCY
+    interface = gsioc.GsiocInterface(serial_port="loopback", unit_id=1)
+
+    commands = {
+        "immediate": lambda interface, i: interface.immediate_command("%"),
+        "buffered": lambda interface, i: interface.buffered_command(f"X{i:06}"),
+        "buffered by char": lambda interface, i: interface.buffered_command(
+            f"X{i:06}", block_mode=False
+        ),
+        "buffered async": lambda interface, i: asyncio.run(
+            interface.buffered_command_async(f"X{i:06}")
+        ),
+    }
+
+    print(f"{'command':>17} {'handshake (ms)':>15} {'selected (ms)':>14}")
+    for name, send in commands.items():
+        handshake = time_commands(interface, send, handshake_every_time=True)
+        selected = time_commands(interface, send, handshake_every_time=False)
+        print(f"{name:>17} {handshake * 1000:>15.2f} {selected * 1000:>14.2f}")
+    interface.close()
+
+
+if __name__ == "__main__":
+    main()
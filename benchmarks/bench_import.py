@@ -0,0 +1,61 @@
+"""
+Benchmark for the time taken by `import mechwolf`.
+
+Each import happens in a fresh interpreter with `python -X importtime`. The median
+total import time is reported, along with the slowest modules imported directly
+by `mechwolf` in the last run.
+
+Usage:
+
+    python benchmarks/bench_import.py
+"""
+
+import statistics
+import subprocess
+import sys
+
+N_RUNS = 5
+N_SLOWEST = 10
+
+
+def import_times():
+    """Returns the cumulative time of `import mechwolf` and of its direct imports."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import mechwolf"],
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+    entries = []  # (depth, name, seconds), with children before their parents
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        entries.append((depth, name.strip(), int(cumulative) / 1e6))
+
+    # mechwolf is imported last, right after its subtree
+    *subtree, (_, _, total) = entries
+    times = {}
+    for depth, name, seconds in reversed(subtree):
+        if depth == 0:
+            break
+        elif depth == 1:
+            times[name] = seconds
+    return total, times
+
+
+def main():
+    runs = [import_times() for _ in range(N_RUNS)]
+    total = statistics.median(total for total, _ in runs)
+    print(f"import mechwolf: {total:.3f} s (median of {N_RUNS} runs)\n")
+
+    print(f"{'module':>30} {'cumulative (s)':>15}")
+    _, times = runs[-1]
+    slowest = sorted(times.items(), key=lambda x: x[1], reverse=True)
+    for name, seconds in slowest[:N_SLOWEST]:
+        print(f"{name:>30} {seconds:>15.3f}")
+
+
+if __name__ == "__main__":
+    main()
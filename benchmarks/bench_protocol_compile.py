@@ -0,0 +1,59 @@
+"""
+Benchmark for `Protocol._compile` on large protocols.
+
+Procedures are appended directly to `Protocol.procedures` (in the same form that
+`Protocol.add` produces) so that only compilation is timed. Compile time per
+procedure should stay roughly flat as the protocol grows.
+
+Usage:
+
+    python benchmarks/bench_protocol_compile.py
+"""
+
+import time
+import warnings
+
+import mechwolf as mw
+
+SIZES = [1_000, 10_000, 100_000]
+N_PUMPS = 20
+
+
+def build_protocol(n_procedures: int) -> mw.Protocol:
+    A = mw.Apparatus()
+    tube = mw.Tube(length="1 foot", ID="1/16 in", OD="1/8 in", material="PFA")
+    pumps = [mw.DummyPump(name=f"pump_{i}") for i in range(N_PUMPS)]
+    for from_pump, to_pump in zip(pumps, pumps[1:]):
+        A.add(from_pump, to_pump, tube)
+
+    P = mw.Protocol(A)
+    per_pump = n_procedures // N_PUMPS
+
+    # interleave the pumps so that procedures aren't already grouped or sorted
+    for step in reversed(range(per_pump)):
+        for pump in pumps:
+            P.procedures.append(
+                dict(
+                    start=float(step),
+                    stop=float(step + 1),
+                    component=pump,
+                    params={"rate": "5 mL/min"},
+                )
+            )
+    return P
+
+
+def main():
+    print(f"{'procedures':>12} {'compile (s)':>12} {'us/procedure':>14}")
+    for size in SIZES:
+        P = build_protocol(size)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            start = time.perf_counter()
+            P._compile(dry_run=True)
+            elapsed = time.perf_counter() - start
+        print(f"{size:>12} {elapsed:>12.3f} {elapsed / size * 1e6:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
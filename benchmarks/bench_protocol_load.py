@@ -0,0 +1,88 @@
+"""
+Benchmark for loading saved protocols.
+
+A protocol with many procedures is saved with `Protocol.to_list()`, `json()`, and
+`yaml()` and then loaded back, both by calling `Protocol.add()` for each procedure
+and with `Protocol.from_list()`, `from_json()`, and `from_yaml()`, which check each
+distinct value only once. Almost all of `from_yaml()`'s time is spent by PyYAML
+parsing the YAML, even with libyaml, which makes it slower than the `add()` loop.
+JSON is the format to use for large protocols.
+
+Usage:
+
+    python benchmarks/bench_protocol_load.py
+"""
+
+import time
+import warnings
+from datetime import timedelta
+
+import mechwolf as mw
+
+N_PROCEDURES = 50_000
+N_PUMPS = 10
+
+
+def build_protocol() -> mw.Protocol:
+    A = mw.Apparatus()
+    tube = mw.Tube(length="1 foot", ID="1/16 in", OD="1/8 in", material="PFA")
+    pumps = [mw.DummyPump(name=f"pump_{i}") for i in range(N_PUMPS)]
+    for from_pump, to_pump in zip(pumps, pumps[1:]):
+        A.add(from_pump, to_pump, tube)
+
+    P = mw.Protocol(A)
+    for step in range(N_PROCEDURES // N_PUMPS):
+        P.procedures.extend(
+            dict(
+                start=float(step),
+                stop=float(step + 1),
+                component=pump,
+                params={"rate": f"{step % 10} mL/min"},
+            )
+            for pump in pumps
+        )
+    return P
+
+
+def add_each(apparatus, procedures) -> mw.Protocol:
+    P = mw.Protocol(apparatus)
+    for procedure in procedures:
+        P.add(
+            apparatus[procedure["component"]],
+            start=timedelta(seconds=procedure["start"]),
+            stop=timedelta(seconds=procedure["stop"]),
+            **procedure["params"],
+        )
+    return P
+
+
+def main():
+    P = build_protocol()
+    A = P.apparatus
+    procedures, saved_json, saved_yaml = P.to_list(), P.json(), P.yaml()
+
+    print(f"{N_PROCEDURES} procedures\n")
+    print(f"{'method':>12} {'load (s)':>9} {'us/procedure':>13} {'vs add()':>9}")
+    add_time = None
+    for method, load in [
+        ("add()", lambda: add_each(A, procedures)),
+        ("from_list()", lambda: mw.Protocol.from_list(A, procedures)),
+        ("from_json()", lambda: mw.Protocol.from_json(A, saved_json)),
+        ("from_yaml()", lambda: mw.Protocol.from_yaml(A, saved_yaml)),
+    ]:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            start = time.perf_counter()
+            loaded = load()
+            elapsed = time.perf_counter() - start
+        assert loaded.procedures == P.procedures
+        if add_time is None:
+            add_time = elapsed
+        print(
+            f"{method:>12} {elapsed:>9.3f} {elapsed / N_PROCEDURES * 1e6:>13.2f}"
+            f" {add_time / elapsed:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark comparing the "tasks" and "heap" procedure schedulers.
+
+A protocol with many short procedures is executed as a sped-up dry run under each
+scheduler. The peak memory allocated while the protocol executes (as seen by
+tracemalloc, excluding compilation) and the dispatch latency (how late each
+procedure ran relative to its scheduled time) are reported. Requires Python 3.9+.
+
+Usage:
+
+    python benchmarks/bench_scheduler.py
+"""
+
+import statistics
+import time
+import tracemalloc
+import warnings
+
+import mechwolf as mw
+import mechwolf.core.experiment
+
+N_PUMPS = 10
+STEPS_PER_PUMP = 2_000
+SPEED = 100  # the dry run's speed multiplier
+
+
+def build_protocol() -> mw.Protocol:
+    A = mw.Apparatus()
+    tube = mw.Tube(length="1 foot", ID="1/16 in", OD="1/8 in", material="PFA")
+    pumps = [mw.DummyPump(name=f"pump_{i}") for i in range(N_PUMPS)]
+    for from_pump, to_pump in zip(pumps, pumps[1:]):
+        A.add(from_pump, to_pump, tube)
+
+    P = mw.Protocol(A)
+    for pump in pumps:
+        for step in range(STEPS_PER_PUMP):
+            P.procedures.append(
+                dict(
+                    start=step * 0.1,
+                    stop=(step + 1) * 0.1,
+                    component=pump,
+                    params={"rate": f"{step % 10} mL/min"},
+                )
+            )
+    return P
+
+
+def trace_execution(main):
+    """Wraps execute.main() to only measure the memory used while executing."""
+    memory = {}
+
+    async def traced_main(*args, **kwargs):
+        tracemalloc.reset_peak()
+        memory["before"], _ = tracemalloc.get_traced_memory()
+        await main(*args, **kwargs)
+        _, memory["peak"] = tracemalloc.get_traced_memory()
+
+    return traced_main, memory
+
+
+def run(scheduler: str):
+    P = build_protocol()
+
+    main = mechwolf.core.experiment.main
+    mechwolf.core.experiment.main, memory = trace_execution(main)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        E = P.execute(
+            dry_run=SPEED,
+            confirm=True,
+            log_file=None,
+            data_file=None,
+            scheduler=scheduler,
+        )
+    elapsed = time.perf_counter() - start
+    tracemalloc.stop()
+    mechwolf.core.experiment.main = main
+    peak = memory["peak"] - memory["before"]
+
+    # match the executed procedures to their scheduled times
+    latencies = []
+    for component, compiled in E._compiled_protocol.items():
+        executed = [x for x in E.executed_procedures if x["component"] is component]
+        for procedure, record in zip(compiled, executed):
+            scheduled = procedure["time"] / SPEED
+            latencies.append(record["experiment_elapsed_time"] - scheduled)
+
+    return elapsed, peak, latencies
+
+
+def main():
+    print(f"{N_PUMPS * STEPS_PER_PUMP} procedures at {SPEED}x speed\n")
+    print(
+        f"{'scheduler':>10} {'wall (s)':>9} {'peak mem (MB)':>14} "
+        f"{'median lag (ms)':>16} {'p99 lag (ms)':>13}"
+    )
+    for scheduler in ["tasks", "heap"]:
+        elapsed, peak, latencies = run(scheduler)
+        latencies.sort()
+        median = statistics.median(latencies) * 1000
+        p99 = latencies[int(len(latencies) * 0.99)] * 1000
+        print(
+            f"{scheduler:>10} {elapsed:>9.2f} {peak / 1e6:>14.1f} "
+            f"{median:>16.2f} {p99:>13.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
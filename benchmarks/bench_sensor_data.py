@@ -0,0 +1,56 @@
+"""
+Memory benchmark for `SensorData` against a list of `Datapoint` namedtuples.
+
+Stores a sensor's worth of float readings both ways and reports the memory held
+by each (as seen by tracemalloc) along with the time taken to append them. The
+list of namedtuples is how `Experiment.data` stored readings before it became
+columnar; it is also roughly what `_transformed_data` duplicated for plotting.
+
+Usage:
+
+    python benchmarks/bench_sensor_data.py
+"""
+
+import random
+import time
+import tracemalloc
+
+from mechwolf.core.data import Datapoint, SensorData
+
+SIZES = [10_000, 100_000, 1_000_000]
+
+
+def measure(container, n: int):
+    start_time = 1_600_000_000.0
+    tracemalloc.start()
+    start = time.perf_counter()
+    for i in range(n):
+        container.append(
+            Datapoint(
+                data=random.random(),
+                timestamp=start_time + i / 50,
+                experiment_elapsed_time=i / 50,
+            )
+        )
+    elapsed = time.perf_counter() - start
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, memory
+
+
+def main():
+    print(
+        f"{'datapoints':>11} {'storage':>11} {'memory (MB)':>12} "
+        f"{'bytes/point':>12} {'append (s)':>11}"
+    )
+    for n in SIZES:
+        for name, container in [("namedtuple", []), ("SensorData", SensorData())]:
+            elapsed, memory = measure(container, n)
+            print(
+                f"{n:>11} {name:>11} {memory / 1e6:>12.1f} "
+                f"{memory / n:>12.1f} {elapsed:>11.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
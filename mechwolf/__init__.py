@@ -1,14 +1,55 @@
+import sys
+from copy import copy
+from functools import lru_cache
+
 from pint import UnitRegistry
 
+try:
+    from importlib.metadata import version
+except ImportError:  # Python 3.7
+    from importlib_metadata import version  # type: ignore
+
 # unit registry for conversions
 _ureg = UnitRegistry(autoconvert_offset_to_baseunit=True)
-import pkg_resources
 
-__version__ = pkg_resources.get_distribution("mechwolf").version
 
-from IPython import get_ipython
+@lru_cache(maxsize=4096)
+def _cached_parse_expression(expression: str):
+    return _ureg.parse_expression(expression)
+
+
+def _parse_expression(expression):
+    """
+    A cached drop-in replacement for `_ureg.parse_expression`.
+
+    Parsed strings are kept in a bounded LRU cache and callers get their own copy, so the cached quantities are never modified.
+    For profiling, `_parse_expression.cache_info()` reports the cache's hits and misses.
+    """
+    if not isinstance(expression, str):
+        return _ureg.parse_expression(expression)
+    return copy(_cached_parse_expression(expression))
+
+
+_parse_expression.cache_info = _cached_parse_expression.cache_info  # type: ignore
+_parse_expression.cache_clear = _cached_parse_expression.cache_clear  # type: ignore
+
+
+def _get_ipython():
+    """
+    A cheap drop-in replacement for `IPython.get_ipython`.
+
+    There can't be a running IPython shell if IPython hasn't been imported, so this avoids importing it in plain Python.
+    """
+    if "IPython" not in sys.modules:
+        return None
+    from IPython import get_ipython
+
+    return get_ipython()
+
+
+__version__ = version("mechwolf")
 
-if get_ipython():
+if _get_ipython():
     import nest_asyncio
 
     nest_asyncio.apply()
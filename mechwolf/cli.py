@@ -0,0 +1,251 @@
+"""
+The `mechwolf` command-line interface, for executing protocols headlessly.
+
+Usage:
+
+    mechwolf run APPARATUS PROTOCOL [options]
+
+`APPARATUS` is a Python file that defines an `Apparatus`. If it defines more than one, pick one with `path/to/file.py:name`.
+`PROTOCOL` is a YAML or JSON file of procedures, in the format output by `Protocol.yaml()` and `Protocol.json()`.
+
+The exit status is one of `EXIT_SUCCESS`, `EXIT_FAILURE`, `EXIT_INVALID`, or `EXIT_CANCELLED`.
+"""
+
+import argparse
+import runpy
+import signal
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+from loguru import logger
+
+from .core.apparatus import Apparatus
+from .core.execute import ProtocolCancelled
+from .core.experiment import Experiment
+from .core.protocol import Protocol
+
+EXIT_SUCCESS = 0
+EXIT_FAILURE = 1  # the protocol failed during execution
+EXIT_INVALID = 2  # bad arguments, or an invalid apparatus or protocol
+EXIT_CANCELLED = 3  # stopped by SIGINT or SIGTERM
+
+
+def load_apparatus(spec: str) -> Apparatus:
+    """
+    Loads an apparatus from a Python file.
+
+    Arguments:
+    - `spec`: The path to the file, optionally followed by `:name`, where `name` is the apparatus's variable name in the file.
+
+    Returns:
+    - The `Apparatus`.
+
+    Raises:
+    - `ValueError`: When the file doesn't define exactly one apparatus and no name was given, or the named variable isn't an `Apparatus`.
+    """
+    # Windows paths have colons in them too, so the name must come after the ".py"
+    path, name = spec.rsplit(":", 1) if ".py:" in spec else (spec, "")
+    namespace = runpy.run_path(path)
+
+    if name:
+        apparatus = namespace.get(name)
+        if not isinstance(apparatus, Apparatus):
+            raise ValueError(f"{name} in {path} is not an Apparatus.")
+        return apparatus
+
+    apparatuses = {
+        id(x): x for x in namespace.values() if isinstance(x, Apparatus)
+    }.values()
+    if len(apparatuses) != 1:
+        raise ValueError(
+            f"Expected {path} to define one Apparatus but found {len(apparatuses)}. "
+            f"Use {path}:name to pick one."
+        )
+    return next(iter(apparatuses))
+
+
+def load_protocol(apparatus: Apparatus, path: str) -> Protocol:
+    """
+    Loads a protocol from a YAML or JSON file.
+
+    Arguments:
+    - `apparatus`: The apparatus to resolve the procedures' component names against.
+    - `path`: The path to the file. Files ending in `.json` are read as JSON and all others as YAML. See `Protocol.from_json()` and `Protocol.from_yaml()` for the format.
+
+    Returns:
+    - The `Protocol`, named after the file.
+    """
+    with open(path) as f:
+        text = f.read()
+
+    if Path(path).suffix.lower() == ".json":
+        return Protocol.from_json(apparatus, text, name=Path(path).stem)
+    return Protocol.from_yaml(apparatus, text, name=Path(path).stem)
+
+
+@contextmanager
+def _cancel_on_signals(experiment: Experiment) -> Iterator[None]:
+    """Cancels the experiment on SIGINT or SIGTERM, so that it stops cleanly."""
+
+    def cancel(signum, frame):
+        logger.warning(f"Received {signal.Signals(signum).name}. Cancelling...")
+
+        # wake the event loop up if it's running; otherwise, main() sees the flag
+        loop = experiment._loop
+        if loop is not None and loop.is_running():
+            loop.call_soon_threadsafe(setattr, experiment, "cancelled", True)
+        else:
+            experiment.cancelled = True
+
+    previous = {
+        signum: signal.signal(signum, cancel)
+        for signum in [signal.SIGINT, signal.SIGTERM]
+    }
+    try:
+        yield
+    finally:
+        for signum, handler in previous.items():
+            signal.signal(signum, handler)
+
+
+def run(args: argparse.Namespace) -> int:
+    """Executes a protocol and returns the exit status."""
+    try:
+        apparatus = load_apparatus(args.apparatus)
+        protocol = load_protocol(apparatus, args.protocol)
+        # compile now to catch invalid procedures (execution reuses the result)
+        protocol._compile(dry_run=True, _resolve=True)
+    except Exception as e:
+        logger.opt(exception=args.verbosity in ("debug", "trace")).error(
+            f"Failed to load the protocol: {e!r}"
+        )
+        return EXIT_INVALID
+
+    E = Experiment(protocol)
+    try:
+        with _cancel_on_signals(E):
+            E._execute(
+                dry_run=args.dry_run,
+                verbosity=args.verbosity,
+                confirm=True,
+                strict=not args.no_strict,
+                log_file=args.log_file,
+                log_file_verbosity=args.log_file_verbosity,
+                log_file_compression=None,
+                data_file=args.data_file,
+                scheduler=args.scheduler,
+            )
+    except Exception as e:
+        # such as when the components fail to connect
+        logger.opt(exception=True).error(f"Failed to execute {protocol}: {e!r}")
+        E._error = e
+
+    if E.cancelled or isinstance(E._error, ProtocolCancelled):
+        return EXIT_CANCELLED
+    elif E._error is not None:
+        return EXIT_FAILURE
+    return EXIT_SUCCESS
+
+
+def _dry_run(value: str):
+    """Parses the --dry-run speed, which is given as an integer."""
+    speed = int(value)
+    if speed < 1:
+        raise argparse.ArgumentTypeError("the speed must be at least 1")
+    return True if speed == 1 else speed
+
+
+def _file(value: str):
+    """Parses a log or data file argument, where "none" disables the file."""
+    return False if value.lower() == "none" else value
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="mechwolf",
+        description="Continuous flow process description, analysis, and automation",
+    )
+    subparsers = parser.add_subparsers(dest="command", metavar="command")
+    subparsers.required = True
+
+    run_parser = subparsers.add_parser(
+        "run",
+        help="execute a protocol",
+        description="Execute a protocol without a notebook or confirmation prompt.",
+    )
+    run_parser.add_argument(
+        "apparatus", help="a Python file defining the apparatus (path.py[:name])"
+    )
+    run_parser.add_argument("protocol", help="a YAML or JSON file of procedures")
+    run_parser.add_argument(
+        "--dry-run",
+        type=_dry_run,
+        nargs="?",
+        const=True,
+        default=False,
+        metavar="SPEED",
+        help="simulate the experiment, optionally at SPEED times speed",
+    )
+    run_parser.add_argument(
+        "--verbosity",
+        default="info",
+        choices=["critical", "error", "warning", "success", "info", "debug", "trace"],
+        help="the level of logs to print to stderr (default: info)",
+    )
+    run_parser.add_argument(
+        "--log-file",
+        type=_file,
+        default=True,
+        help="where to write the logs, or none (default: ~/.mechwolf)",
+    )
+    run_parser.add_argument(
+        "--log-file-verbosity",
+        default="trace",
+        choices=["critical", "error", "warning", "success", "info", "debug", "trace"],
+        help="the level of logs to write to the log file (default: trace)",
+    )
+    run_parser.add_argument(
+        "--data-file",
+        type=_file,
+        default=True,
+        help="where to write the data, or none (default: ~/.mechwolf)",
+    )
+    run_parser.add_argument(
+        "--scheduler",
+        default="tasks",
+        choices=["tasks", "heap"],
+        help="how procedures are scheduled (default: tasks)",
+    )
+    run_parser.add_argument(
+        "--no-strict",
+        action="store_true",
+        help="keep going after errors instead of stopping the experiment",
+    )
+    run_parser.set_defaults(func=run)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    The entry point of the `mechwolf` command.
+
+    Arguments:
+    - `argv`: The command-line arguments, excluding the program name. Defaults to `sys.argv[1:]`.
+
+    Returns:
+    - The exit status.
+    """
+    args = _parser().parse_args(argv)
+    handler_id = logger.add(
+        sys.stderr, level=args.verbosity.upper(), format="{level.icon} {message}"
+    )
+    try:
+        return args.func(args)
+    finally:
+        logger.remove(handler_id)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
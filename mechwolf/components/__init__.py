@@ -1,4 +1,4 @@
-from mechwolf import _ureg
+from mechwolf import _parse_expression, _ureg
 
 from .contrib import *
 from .stdlib import *
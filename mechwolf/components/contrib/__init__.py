@@ -1,4 +1,4 @@
-from .. import _ureg
+from .. import _parse_expression, _ureg
 
 from .arduino import ArduinoSensor
 from .fc203 import GilsonFC203
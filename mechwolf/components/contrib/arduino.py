@@ -1,7 +1,15 @@
-from typing import Optional, Union
+import asyncio
+import time
+from collections import deque
+from typing import TYPE_CHECKING, AsyncGenerator, Deque, Optional, Tuple, Union
+
+from loguru import logger
 
 from ..stdlib.sensor import Sensor
 
+if TYPE_CHECKING:
+    import mechwolf
+
 
 class ArduinoSensor(Sensor):
     """
@@ -12,10 +20,20 @@ class ArduinoSensor(Sensor):
     They listen for a single byte command in their main `loop()`.
     When commanded, they respond with some ASCII data.
 
+    In streaming mode, the device instead pushes one line of ASCII data per sample without being asked, at a rate set by its firmware.
+    While the sensor is on, a background task waits for the incoming lines and parses them into a ring buffer, which is drained in batches, so there's no per-sample round trip.
+    The sensor's `rate` then only turns it on (any nonzero rate) and off.
+
     Arguments:
     - `serial_port`: Serial port through which device is connected
     - `name`: The name of the component.
     - `command`: Command to be sent to device to request reading. `'*'` by default.
+    - `fixed_rate`: Whether to sample at fixed intervals from the start of the experiment. See `Sensor`.
+    - `skip_missed_samples`: Whether to skip missed deadlines in fixed-rate mode. See `Sensor`.
+    - `streaming`: Whether the device streams its samples continuously.
+    - `stream_command`: In streaming mode, the command sent to start streaming when the sensor is turned on. If `None`, the device is assumed to stream on its own.
+    - `stop_command`: In streaming mode, the command sent to stop streaming when the sensor is turned off, if any.
+    - `buffer_size`: In streaming mode, the number of samples the ring buffer holds. If it fills up between drains, the oldest samples are dropped.
 
     Returns:
     - When read, returns the parsed response, which can be an `int` or `float`.
@@ -36,11 +54,39 @@ class ArduinoSensor(Sensor):
     }
 
     def __init__(
-        self, serial_port: str, name: Optional[str] = None, command: str = "*"
+        self,
+        serial_port: str,
+        name: Optional[str] = None,
+        command: str = "*",
+        fixed_rate: bool = False,
+        skip_missed_samples: bool = False,
+        streaming: bool = False,
+        stream_command: Optional[str] = None,
+        stop_command: Optional[str] = None,
+        buffer_size: int = 100_000,
     ):
-        super().__init__(name=name)
+        super().__init__(
+            name=name,
+            fixed_rate=fixed_rate,
+            skip_missed_samples=skip_missed_samples,
+        )
         self.serial_port = serial_port
         self.command = command.encode(encoding="ASCII")
+        self.streaming = streaming
+        self.stream_command = (
+            stream_command.encode(encoding="ASCII") if stream_command else None
+        )
+        self.stop_command = (
+            stop_command.encode(encoding="ASCII") if stop_command else None
+        )
+        self.buffer_size = buffer_size
+
+        # internal values (unstable!)
+        self._stream_buffer: Deque[Tuple[Union[int, float], float]] = deque(
+            maxlen=buffer_size
+        )
+        self._dropped_samples = 0  # samples pushed out of a full ring buffer
+        self._drain_interval = 0.05  # how often the monitor drains the buffer (s)
 
     def __enter__(self):
         import aioserial
@@ -60,20 +106,117 @@ class ArduinoSensor(Sensor):
         # when it is out of context
         del self.ser
 
+    @staticmethod
+    def _parse(line: bytes) -> Union[int, float]:
+        data = line.decode(encoding="ASCII").strip()
+        try:
+            # maybe it is a nice integer (straight from ADC)
+            return int(data)
+        except ValueError:
+            # otherwise it is a float
+            return float(data)
+
     async def _read(self) -> Union[int, float]:
 
         # flush in buffer in case we have stale data
         self.ser.reset_input_buffer()
 
-        # send the command
-        await self.ser.write_async(self.command)
+        if self.streaming and self.stream_command is None:
+            # the device is already streaming, so skip to the next full line
+            await self.ser.readline_async()
+        else:
+            # send the command
+            await self.ser.write_async(self.command)
         # read the data and sanitize
-        data = await self.ser.readline_async()
-        data = data.decode(encoding="ASCII").strip()
+        return self._parse(await self.ser.readline_async())
 
+    async def _stream(self) -> None:
+        """Parses the lines pushed by the device into the ring buffer, until cancelled."""
+        partial = b""
+        synced = False  # whether we've seen the end of a line yet
         try:
-            # maybe it is a nice integer (straight from ADC)
-            return int(data)
-        except ValueError:
-            # otherwise it is a float
-            return float(data)
+            while True:
+                # wait on aioserial's reader thread for the next byte,
+                # then take whatever else has arrived along with it
+                chunk = await self.ser.read_async(1)
+                waiting = self.ser.in_waiting
+                if waiting:
+                    chunk += self.ser.read(waiting)
+
+                lines = (partial + chunk).split(b"\n")
+                partial = lines.pop()
+                if lines and not synced:
+                    # we might have started listening partway through the first line
+                    lines.pop(0)
+                    synced = True
+                timestamp = time.time()
+                for line in lines:
+                    try:
+                        value = self._parse(line)
+                    except (UnicodeDecodeError, ValueError):
+                        logger.trace(f"{self} skipped unparseable line {line!r}.")
+                        continue
+                    if len(self._stream_buffer) == self.buffer_size:
+                        self._dropped_samples += 1
+                    self._stream_buffer.append((value, timestamp))
+        finally:
+            # don't leave a read blocking aioserial's reader thread
+            self.ser.cancel_read()
+
+    async def _start_stream(self) -> "asyncio.Future":
+        """Starts the device streaming, if needed, and returns the task reading it."""
+        self._stream_buffer.clear()
+        self.ser.reset_input_buffer()
+        if self.stream_command is not None:
+            await self.ser.write_async(self.stream_command)
+        return asyncio.ensure_future(self._stream())
+
+    async def _stop_stream(self, reader: "asyncio.Future") -> None:
+        """Cancels the task reading the stream and stops the device streaming, if needed."""
+        reader.cancel()
+        await asyncio.wait([reader])
+        if self.stop_command is not None:
+            await self.ser.write_async(self.stop_command)
+
+    async def _monitor(
+        self, experiment: "mechwolf.Experiment", dry_run: bool = False
+    ) -> AsyncGenerator:
+        if not self.streaming or dry_run:
+            async for result in super()._monitor(experiment, dry_run=dry_run):
+                yield result
+            return
+
+        self._rate_changed = asyncio.Event()
+        self._dropped_samples = 0
+        reader: Optional[asyncio.Future] = None
+
+        try:
+            while not experiment._end_loop:
+                # only listen to the device while the sensor is on
+                if not self.rate:
+                    if reader is not None:
+                        await self._stop_stream(reader)
+                        reader = None
+                    await self._wait_until_on(experiment)
+                    continue
+
+                if reader is None:
+                    reader = await self._start_stream()
+                elif reader.done():
+                    reader.result()  # raises whatever stopped the reader
+
+                await asyncio.sleep(self._drain_interval)
+                for _ in range(len(self._stream_buffer)):
+                    data, timestamp = self._stream_buffer.popleft()
+                    yield {"data": data, "timestamp": timestamp}
+        finally:
+            self._rate_changed = None
+            if reader is not None:
+                await self._stop_stream(reader)
+
+        if self._dropped_samples:
+            logger.warning(
+                f"{self} dropped {self._dropped_samples} streamed sample(s) "
+                "because its buffer was full."
+            )
+        logger.debug(f"Monitor loop for {self} has completed.")
@@ -46,16 +46,24 @@ class GilsonFC203(ActiveComponent):
         # create the serial connection
         self._gsioc = GsiocInterface(serial_port=self.serial_port, unit_id=self.unit_id)
 
-        self._lock()
-        self._gsioc.buffered_command("W1        MechWolf")
-        self._gsioc.buffered_command("W2                ")
+        try:
+            self._lock()
+            self._gsioc.buffered_command("W1        MechWolf")
+            self._gsioc.buffered_command("W2                ")
+        except BaseException:
+            self._gsioc.close()  # give the shared bus back
+            del self._gsioc
+            raise
         return self
 
     def __exit__(self, exc_type, exc_value, traceback):
-        self._gsioc.buffered_command("W1        MechWolf")
-        self._gsioc.buffered_command("W2          Done!   ")
-        self._unlock()
-        del self._gsioc
+        try:
+            self._gsioc.buffered_command("W1        MechWolf")
+            self._gsioc.buffered_command("W2          Done!   ")
+            self._unlock()
+        finally:
+            self._gsioc.close()  # give the shared bus back
+            del self._gsioc
 
     def _lock(self):
         self._gsioc.buffered_command("L0")
@@ -1,5 +1,212 @@
+import asyncio
+import inspect
+import threading
+import time
+from concurrent.futures import Future
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
 from loguru import logger
 
+# 11 bits per character at 19200 baud, both ways, plus the device's turnaround
+_ECHO_TIME_PER_CHAR = 0.002
+
+
+class GsiocBus(object):
+    """
+    A GSIOC bus, shared by all of the devices on one serial port.
+
+    ::: warning This is not an ActiveComponent.
+
+    It is a helper class used by [`GsiocInterface`](#gsiocinterface), which opens and closes buses automatically.
+
+    :::
+
+    GSIOC is a multi-drop bus: many devices share one serial line and only one of them (the selected unit) listens at a time.
+    The bus owns the only serial connection to its port and keeps track of the selected unit.
+    Commands from all of the units on the bus, sync and async, are sent one at a time from a queue by a worker running in the bus's own thread.
+    Sync commands block until the worker has sent them, but never stall it, even when called from an event loop.
+    Whenever several commands are waiting, they are grouped by unit, starting with the selected one, so that the bus switches units as rarely as possible.
+    Each unit's commands are still sent in the order they were submitted.
+
+    Arguments:
+    - `serial_port`: The serial port of the bus.
+
+    Attributes:
+    - `selected`: The GSIOC ID of the selected unit, if any.
+    - `serial_port`: The serial port of the bus.
+    """
+
+    _buses: Dict[Optional[str], "GsiocBus"] = {}
+
+    def __init__(self, serial_port: Optional[str] = None):
+        import aioserial
+
+        self.serial_port = serial_port
+        self.selected: Optional[int] = None
+        self._ser = aioserial.AioSerial(
+            serial_port, baudrate=19200, parity="E", stopbits=1, timeout=0.02
+        )
+
+        # internal values (unstable!)
+        self._users = 0
+        self._thread_lock = threading.Lock()  # held while starting the thread
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None  # run by the thread
+        self._queue: Optional[asyncio.Queue] = None  # only used from the thread
+        self._worker: Optional["asyncio.Future[None]"] = None
+        self._commands = 0
+        self._unit_switches = 0
+        self._total_latency = 0.0
+        self._max_latency = 0.0
+
+    def __repr__(self):
+        return f"<{self}>"
+
+    def __str__(self):
+        return f"GsiocBus on port {self.serial_port}"
+
+    @classmethod
+    def open(cls, serial_port: Optional[str]) -> "GsiocBus":
+        """
+        Returns the bus on a serial port, connecting to it if it isn't already open.
+
+        Every call must be matched by a call to [`close`](#close).
+        """
+        if serial_port not in cls._buses:
+            cls._buses[serial_port] = cls(serial_port)
+        bus = cls._buses[serial_port]
+        bus._users += 1
+        return bus
+
+    def close(self) -> None:
+        """Releases the bus, closing the serial connection once it's no longer used."""
+        self._users -= 1
+        if self._users > 0:
+            return
+        logger.trace(f"Closing {self}. Metrics: {self.metrics}")
+        if GsiocBus._buses.get(self.serial_port) is self:
+            del GsiocBus._buses[self.serial_port]
+        if self._thread is not None and self._loop is not None:
+            asyncio.run_coroutine_threadsafe(self._stop(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+            self._thread = self._loop = None
+        self._ser.close()
+
+    @property
+    def queue_depth(self) -> int:
+        """How many async commands are waiting to be sent."""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    @property
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Statistics about the bus's async commands.
+
+        Returns:
+        - A dict with the number of `commands` sent, the number of `unit_switches`, the current `queue_depth`, and the `mean_latency` and `max_latency` in seconds between a command being submitted and completed.
+        """
+        mean_latency = self._total_latency / self._commands if self._commands else 0.0
+        return {
+            "commands": self._commands,
+            "unit_switches": self._unit_switches,
+            "queue_depth": self.queue_depth,
+            "mean_latency": mean_latency,
+            "max_latency": self._max_latency,
+        }
+
+    def _select(self, gsioc_id: Optional[int]) -> None:
+        if gsioc_id is not None and gsioc_id != self.selected:
+            self._unit_switches += 1
+        self.selected = gsioc_id
+
+    async def submit(self, gsioc_id: int, send: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Queues a command for a unit and waits for its result.
+
+        Arguments:
+        - `gsioc_id`: The GSIOC ID of the unit that the command is for.
+        - `send`: A coroutine function that sends the command. It's run in the bus's thread.
+
+        Returns:
+        - The return value of `send`.
+        """
+        return await asyncio.wrap_future(self._submit_threadsafe(gsioc_id, send))
+
+    def submit_sync(self, gsioc_id: int, send: Callable[[], Any]) -> Any:
+        """
+        Queues a command for a unit and blocks until it has been sent.
+
+        Arguments:
+        - `gsioc_id`: The GSIOC ID of the unit that the command is for.
+        - `send`: A function that sends the command. It's run in the bus's thread.
+
+        Returns:
+        - The return value of `send`.
+        """
+        return self._submit_threadsafe(gsioc_id, send).result()
+
+    def _submit_threadsafe(self, gsioc_id: int, send: Callable[[], Any]) -> Future:
+        with self._thread_lock:
+            if self._thread is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever, name=str(self), daemon=True
+                )
+                self._thread.start()
+        assert self._loop is not None  # make the type checker happy
+        return asyncio.run_coroutine_threadsafe(
+            self._enqueue(gsioc_id, send), self._loop
+        )
+
+    async def _enqueue(self, gsioc_id: int, send: Callable[[], Any]) -> Any:
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.ensure_future(self._work(self._queue))
+
+        future = asyncio.get_event_loop().create_future()
+        await self._queue.put((gsioc_id, send, future, time.time()))
+        return await future
+
+    async def _stop(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            await asyncio.wait([self._worker])
+        self._queue = self._worker = None
+
+    async def _work(self, queue: asyncio.Queue) -> None:
+        while True:
+            batch = [await queue.get()]
+            while not queue.empty():
+                batch.append(queue.get_nowait())
+
+            # group by unit, starting with the selected unit to avoid a switch
+            by_unit: Dict[Optional[int], List[Tuple]] = {self.selected: []}
+            for request in batch:
+                by_unit.setdefault(request[0], []).append(request)
+
+            for requests in by_unit.values():
+                for _, send, future, submitted in requests:
+                    if future.cancelled():
+                        continue
+                    try:
+                        result = send()
+                        if inspect.isawaitable(result):
+                            result = await result
+                    except Exception as e:
+                        if not future.done():
+                            future.set_exception(e)
+                    else:
+                        if not future.done():
+                            future.set_result(result)
+
+                    latency = time.time() - submitted
+                    self._commands += 1
+                    self._total_latency += latency
+                    self._max_latency = max(self._max_latency, latency)
+
 
 class GsiocInterface(object):
     """
@@ -18,12 +225,15 @@ class GsiocInterface(object):
 
     For protocol details please see Gilson document LT2181: GSIOC Technical Manual.
 
+    Interfaces to devices on the same serial port share a [`GsiocBus`](#gsiocbus), and must be closed with [`close`](#close) when they're no longer needed.
+
     Arguments:
     - `serial_port`: The serial port to connect over.
     - `unit_id`: The component's unit ID.
 
     Attributes:
     - `gsioc_id`: The `unit_id`, shifted down by 128 per the GSIOC specification.
+    - `serial_port`: The serial port to connect over.
     """
 
     metadata = {
@@ -41,11 +251,9 @@ class GsiocInterface(object):
     }
 
     def __init__(self, serial_port=None, unit_id=0):
-        import aioserial
-
-        self._ser = aioserial.AioSerial(
-            serial_port, baudrate=19200, parity="E", stopbits=1, timeout=0.02
-        )
+        self.serial_port = serial_port
+        self._bus = GsiocBus.open(serial_port)
+        self._ser = self._bus._ser
 
         # Unit id encoding is offset by 128 per GSIOC specification
         self.gsioc_id = 0x80 + unit_id
@@ -56,18 +264,37 @@ class GsiocInterface(object):
     def __str__(self):
         return f"GsiocInterface {self.gsioc_id - 0x80} on port {self.serial_port}"
 
-    def connect(self):
+    def close(self) -> None:
+        """Releases the interface's bus."""
+        self._bus.close()
+
+    @property
+    def connected(self) -> bool:
+        """Whether this unit is the one currently selected on the bus."""
+        return self._bus.selected == self.gsioc_id
+
+    def _set_connected(self, connected: bool) -> None:
+        self._bus._select(self.gsioc_id if connected else None)
+
+    def connect(self, force: bool = False):
         """
         Connect to a GSIOC device.
 
-        Since GSIOC was designed around multiple slaves, even if we have single device on the bus, we still have to 'connect' to a specific unit_id every time we send out a command.
+        Since GSIOC was designed around multiple slaves, only one unit_id on the bus is selected at a time.
+        The selected unit is tracked by the bus, so the handshake is skipped if this unit is already selected.
+
+        Arguments:
+        - `force`: Whether to handshake even if this unit is already selected.
 
         Raises:
         - `RuntimeError`: When unable to connect.
         """
+        if self.connected and not force:
+            return True
         logger.trace(f"Connecting sync to {self}.")
 
         # Disconnect all slaves
+        self._set_connected(False)
         self._ser.write([0xFF])
         self._ser.reset_input_buffer()
 
@@ -82,6 +309,7 @@ class GsiocInterface(object):
 
             if response == bytes([self.gsioc_id]):
                 logger.trace(f"Connection to {self} successful.")
+                self._set_connected(True)
                 return True
 
             logger.trace("Connection attempt failed.")
@@ -91,15 +319,18 @@ class GsiocInterface(object):
             f"Check 'Unit ID' setting on device."
         )
 
-    async def connect_async(self) -> None:
+    async def connect_async(self, force: bool = False) -> None:
         """
         Async implementation of [`connect`](#connect).
 
         For API docs, see [`connect`](#connect).
         """
+        if self.connected and not force:
+            return
         logger.trace(f"Connecting async to {self}.")
 
         # Disconnect all slaves
+        self._set_connected(False)
         await self._ser.write_async([0xFF])
         self._ser.reset_input_buffer()
 
@@ -114,6 +345,7 @@ class GsiocInterface(object):
 
             if response == bytes([self.gsioc_id]):
                 logger.trace(f"Connection to {self} successful.")
+                self._set_connected(True)
                 return
 
             logger.trace("Connection attempt failed.")
@@ -123,6 +355,50 @@ class GsiocInterface(object):
             f"{self.gsioc_id - 128}. Check 'Unit ID' setting on device."
         )
 
+    def _send(self, send: Callable[[str], Any], command: str) -> Any:
+        """Sends a command with exclusive use of the bus, reconnecting if needed."""
+
+        def session():
+            was_connected = self.connected
+            self.connect()
+            try:
+                return send(command)
+            except Exception as e:
+                self._reconnect_on_error(was_connected, e)
+            self.connect(force=True)
+            return send(command)
+
+        return self._bus.submit_sync(self.gsioc_id, session)
+
+    async def _send_async(
+        self, send: Callable[[str], Awaitable[Any]], command: str
+    ) -> Any:
+        """Async implementation of `_send`, which queues the command on the bus."""
+
+        async def session():
+            was_connected = self.connected
+            await self.connect_async()
+            try:
+                return await send(command)
+            except Exception as e:
+                self._reconnect_on_error(was_connected, e)
+            await self.connect_async(force=True)
+            return await send(command)
+
+        return await self._bus.submit(self.gsioc_id, session)
+
+    def _reconnect_on_error(self, was_connected: bool, error: Exception) -> None:
+        """
+        Handles a failed command by deselecting the unit.
+
+        If the handshake had been skipped, the device may have silently lost its selection (*e.g.* after being power cycled), so it's worth reconnecting and retrying the command once.
+        Otherwise, the error is re-raised.
+        """
+        self._set_connected(False)
+        if not was_connected or not isinstance(error, RuntimeError):
+            raise error
+        logger.debug(f"{self} failed to respond. Reconnecting...")
+
     def immediate_command(self, command: str) -> str:
         """
         Send immediate command.
@@ -134,17 +410,23 @@ class GsiocInterface(object):
 
         Returns:
         - The return value of the command.
+
+        Raises:
+        - `RuntimeError`: When the device does not respond.
         """
 
         logger.trace(f"Writing immediate command '{command}'.")
-        self.connect()
+        return self._send(self._immediate_command, command)
 
+    def _immediate_command(self, command: str) -> str:
         self._ser.write(command.encode(encoding="ascii"))
 
         char = self._ser.read()
 
         response = b""
         while char < b"\x80":
+            if not char:
+                raise RuntimeError("GSIOC device did not respond to immediate command.")
             response += char
             # we ACK the character to get the next one
             self._ser.write([0x06])
@@ -164,14 +446,17 @@ class GsiocInterface(object):
         """
 
         logger.trace(f"Writing immediate command '{command}' async.")
-        await self.connect_async()
+        return await self._send_async(self._immediate_command_async, command)
 
+    async def _immediate_command_async(self, command: str) -> str:
         await self._ser.write_async(command.encode(encoding="ascii"))
 
         char = await self._ser.read_async()
 
         response = b""
         while char < b"\x80":
+            if not char:
+                raise RuntimeError("GSIOC device did not respond to immediate command.")
             response += char
             # we ACK the character to get the next one
             await self._ser.write_async([0x06])
@@ -183,52 +468,73 @@ class GsiocInterface(object):
         logger.trace(f"Got response '{response.decode(encoding='ascii')}'.")
         return response.decode(encoding="ascii")
 
-    def buffered_command(self, command: str) -> None:
+    def buffered_command(self, command: str, block_mode: bool = True) -> None:
         """
         Send buffered command.
 
         Buffered commands send instructions to a slave device.
+        The device echoes back each character of the command, which is checked against what was sent.
 
         Arguments:
         - `command`: The command to execute.
+        - `block_mode`: Whether to write the whole command at once and check the echo in bulk. If the echo doesn't match, the command is resent one character at a time, waiting for each echo.
 
         Raises:
         - `RuntimeError`: When the device is not ready or does not respond.
         """
 
         logger.trace(f"Sending command '{command}'.")
-        self.connect()
-
-        # Making sure slave is ready
-        echo = b""
-        while echo != b"\n":
-            self._ser.write(b"\n")
-            echo = self._ser.read()
+        return self._send(
+            partial(self._buffered_command, block_mode=block_mode), command
+        )
 
-        if echo != b"\n":
-            logger.debug(
-                f"Did not get expected response of '\\n' but "
-                f"rather '{echo.decode(encoding='ascii')}'."
-            )
-            raise RuntimeError("GSIOC device not ready for buffered command.")
+    def _buffered_command(self, command: str, block_mode: bool = True) -> None:
+        self._wait_until_ready()
 
         # Command terminates with a \r
-        for char in command + "\r":
-            byte = char.encode(encoding="ascii")
+        payload = (command + "\r").encode(encoding="ascii")
+
+        if block_mode:
+            timeout = self._ser.timeout
+            self._ser.timeout = self._block_timeout(payload)
+            try:
+                self._ser.write(payload)
+                echo = self._ser.read(len(payload))
+            finally:
+                self._ser.timeout = timeout
+
+            if echo == payload:
+                logger.trace("Command sent successfully.")
+                return
+            self._log_block_mismatch(payload, echo)
+            self._ser.reset_input_buffer()
+            self._wait_until_ready()
+
+        for char in payload:
+            byte = bytes([char])
             self._ser.write(byte)
             # Slave should echo each character back per GSIOC spec.
             echo = self._ser.read()
-
-            if echo != byte:
-                logger.debug(
-                    f"Expected '{byte.decode(encoding='ascii')}', "
-                    f"got '{echo.decode(encoding='ascii')}'."
-                )
-                raise RuntimeError("GSIOC device did not respond to buffered command.")
+            self._check_echo(byte, echo)
 
         logger.trace("Command sent successfully.")
 
-    async def buffered_command_async(self, command: str) -> None:
+    def _wait_until_ready(self) -> None:
+        # Making sure slave is ready
+        # a busy device answers with something other than the '\n', a deselected one doesn't answer at all
+        silences = 0
+        echo = b""
+        while echo != b"\n":
+            self._ser.write(b"\n")
+            echo = self._ser.read()
+            silences = 0 if echo else silences + 1
+            if silences == 3:
+                logger.debug("Did not get expected response of '\\n'.")
+                raise RuntimeError("GSIOC device not ready for buffered command.")
+
+    async def buffered_command_async(
+        self, command: str, block_mode: bool = True
+    ) -> None:
         """
         Async implementation of [`buffered_command`](#buffered-command).
 
@@ -236,33 +542,73 @@ class GsiocInterface(object):
         """
 
         logger.trace(f"Sending command '{command}' async.")
-        await self.connect_async()
+        return await self._send_async(
+            partial(self._buffered_command_async, block_mode=block_mode), command
+        )
 
+    async def _buffered_command_async(
+        self, command: str, block_mode: bool = True
+    ) -> None:
+        await self._wait_until_ready_async()
+
+        # Command terminates with a \r
+        payload = (command + "\r").encode(encoding="ascii")
+
+        if block_mode:
+            timeout = self._ser.timeout
+            self._ser.timeout = self._block_timeout(payload)
+            try:
+                await self._ser.write_async(payload)
+                echo = await self._ser.read_async(len(payload))
+            finally:
+                self._ser.timeout = timeout
+
+            if echo == payload:
+                logger.trace("Command sent successfully.")
+                return
+            self._log_block_mismatch(payload, echo)
+            self._ser.reset_input_buffer()
+            await self._wait_until_ready_async()
+
+        for char in payload:
+            byte = bytes([char])
+            await self._ser.write_async(byte)
+            # Slave should echo each character back per GSIOC spec.
+            echo = await self._ser.read_async()
+            self._check_echo(byte, echo)
+
+        logger.trace("Command sent successfully.")
+
+    async def _wait_until_ready_async(self) -> None:
         # Making sure slave is ready
+        # a busy device answers with something other than the '\n', a deselected one doesn't answer at all
+        silences = 0
         echo = b""
         while echo != b"\n":
             await self._ser.write_async(b"\n")
             echo = await self._ser.read_async()
-
-        if echo != b"\n":
+            silences = 0 if echo else silences + 1
+            if silences == 3:
+                logger.debug("Did not get expected response of '\\n'.")
+                raise RuntimeError("GSIOC device not ready for buffered command.")
+
+    def _block_timeout(self, payload: bytes) -> float:
+        """How long to wait for the echo of a whole command."""
+        # the per-character timeout, plus time for each character to go there and back
+        return (self._ser.timeout or 0) + len(payload) * _ECHO_TIME_PER_CHAR
+
+    @staticmethod
+    def _check_echo(byte: bytes, echo: bytes) -> None:
+        if echo != byte:
             logger.debug(
-                f"Did not get expected response of '\\n' but rather "
-                f"'{echo.decode(encoding='ascii')}'."
+                f"Expected '{byte.decode(encoding='ascii')}', "
+                f"got '{echo.decode(encoding='ascii', errors='replace')}'."
             )
-            raise RuntimeError("GSIOC device not ready for buffered command.")
+            raise RuntimeError("GSIOC device did not respond to buffered command.")
 
-        # Command terminates with a \r
-        for char in command + "\r":
-            byte = char.encode(encoding="ascii")
-            await self._ser.write_async(byte)
-            # Slave should echo each character back per GSIOC spec.
-            echo = await self._ser.read_async()
-
-            if echo != byte:
-                logger.debug(
-                    f"Expected '{byte.decode(encoding='ascii')}', "
-                    f"got '{echo.decode(encoding='ascii')}'."
-                )
-                raise RuntimeError("GSIOC device did not respond to buffered command.")
-
-        logger.trace("Command sent successfully.")
+    @staticmethod
+    def _log_block_mismatch(payload: bytes, echo: bytes) -> None:
+        logger.debug(
+            f"Expected echo {repr(payload)}, got {repr(echo)}. "
+            "Resending one character at a time."
+        )
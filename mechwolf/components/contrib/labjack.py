@@ -1,11 +1,32 @@
+import asyncio
+import time
+from typing import TYPE_CHECKING, AsyncGenerator, Iterator, Optional
+
+from loguru import logger
+
 from ..stdlib.sensor import Sensor
 
+if TYPE_CHECKING:
+    import mechwolf
+
 
 class LabJack(Sensor):
     """
     A driver for the LabJack U3-LV data collection device.
     Currently set up to read differential input between FIO1 and FIO0.
     See labjack.com for more details on their python API.
+
+    All communication with the device, including connecting and disconnecting, happens on the sensor's worker thread, so USB transactions don't block the event loop.
+
+    In streaming mode, the device samples on its own clock at the sensor's `rate` and returns many samples per USB transaction, which allows for kHz-rate acquisition.
+    The stream is restarted whenever the rate changes and stopped while the sensor is off.
+    Timestamps are computed from the start of the stream and the scan frequency.
+
+    Arguments:
+    - `name`: The name of the component.
+    - `fixed_rate`: Whether to sample at fixed intervals from the start of the experiment. See `Sensor`.
+    - `skip_missed_samples`: Whether to skip missed deadlines in fixed-rate mode. See `Sensor`.
+    - `streaming`: Whether to acquire data in stream mode.
     """
 
     metadata = {
@@ -22,8 +43,19 @@ class LabJack(Sensor):
         "supported": True,
     }
 
-    def __init__(self, name=None):
-        super().__init__(name=name)
+    def __init__(
+        self,
+        name=None,
+        fixed_rate=False,
+        skip_missed_samples=False,
+        streaming=False,
+    ):
+        super().__init__(
+            name=name,
+            fixed_rate=fixed_rate,
+            skip_missed_samples=skip_missed_samples,
+        )
+        self.streaming = streaming
 
     def __enter__(self):
         try:
@@ -45,5 +77,88 @@ class LabJack(Sensor):
         self.device.close()
         del self.device
 
+    async def __aenter__(self):
+        # the driver is used from the worker thread only, connecting included
+        await self._run_in_executor(self.__enter__)
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        try:
+            await self._run_in_executor(self.__exit__, exc_type, exc_value, traceback)
+        finally:
+            self._shutdown_executor()
+
     async def _read(self):
-        return self.device.getAIN(0, 1)
+        return await self._run_in_executor(self.device.getAIN, 0, 1)
+
+    def _start_stream(self, scan_frequency: float) -> Iterator[Optional[dict]]:
+        # FIO0 - FIO1, like _read()
+        self.device.streamConfig(
+            NumChannels=1, PChannels=[0], NChannels=[1], ScanFrequency=scan_frequency
+        )
+        self.device.streamStart()
+        return self.device.streamData()
+
+    async def _monitor(
+        self, experiment: "mechwolf.Experiment", dry_run: bool = False
+    ) -> AsyncGenerator:
+        if not self.streaming or dry_run:
+            async for result in super()._monitor(experiment, dry_run=dry_run):
+                yield result
+            return
+
+        self._rate_changed = asyncio.Event()
+        self._missed_samples = 0
+        stream: Optional[Iterator[Optional[dict]]] = None
+        scan_frequency = 0.0
+        start_time = 0.0
+        index = 0  # of the next sample since the start of the stream
+
+        try:
+            while not experiment._end_loop:
+                frequency = self.rate.to_base_units().magnitude if self.rate else 0.0
+
+                # stop the stream if the sensor was turned off or its rate changed
+                if stream is not None and frequency != scan_frequency:
+                    await self._run_in_executor(self.device.streamStop)
+                    stream = None
+
+                if not frequency:
+                    await self._wait_until_on(experiment)
+                    continue
+
+                if stream is None:
+                    scan_frequency = frequency
+                    stream = await self._run_in_executor(
+                        self._start_stream, scan_frequency
+                    )
+                    start_time = time.time()
+                    index = 0
+
+                # each request returns a batch of packets' worth of samples
+                batch = await self._run_in_executor(next, stream)
+                if batch is None:
+                    continue
+                if batch["errors"]:
+                    logger.warning(
+                        f"{self} reported {batch['errors']} stream error(s)."
+                    )
+                if batch["missed"]:
+                    logger.trace(f"{self} missed {batch['missed']} sample(s).")
+                    self._missed_samples += batch["missed"]
+                    index += batch["missed"]
+
+                for value in batch["AIN0"]:
+                    yield {
+                        "data": value,
+                        "timestamp": start_time + index / scan_frequency,
+                    }
+                    index += 1
+        finally:
+            if stream is not None:
+                await self._run_in_executor(self.device.streamStop)
+            self._rate_changed = None
+
+        if self._missed_samples:
+            logger.warning(f"{self} missed {self._missed_samples} streamed sample(s).")
+        logger.debug(f"Monitor loop for {self} has completed.")
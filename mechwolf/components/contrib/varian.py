@@ -1,5 +1,5 @@
 from ..stdlib.pump import Pump
-from . import _ureg
+from . import _parse_expression, _ureg
 
 
 class VarianPump(Pump):
@@ -31,8 +31,8 @@ class VarianPump(Pump):
 
     def __init__(self, serial_port, max_rate, unit_id=0, name=None):
         super().__init__(name=name)
-        self.rate = _ureg.parse_expression("0 ml/min")
-        self.max_rate = _ureg.parse_expression(max_rate)
+        self.rate = _parse_expression("0 ml/min")
+        self.max_rate = _parse_expression(max_rate)
         self.serial_port = serial_port
         self.unit_id = unit_id
 
@@ -41,16 +41,24 @@ class VarianPump(Pump):
 
         self._gsioc = GsiocInterface(serial_port=self.serial_port, unit_id=self.unit_id)
 
-        self._lock()
+        try:
+            self._lock()
+        except BaseException:
+            self._gsioc.close()  # give the shared bus back
+            del self._gsioc
+            raise
 
         return self
 
     def __exit__(self, exc_type, exc_value, traceback):
-        self.rate = _ureg.parse_expression("0 mL/min")
-        # Stop pump
-        self._gsioc.buffered_command("X000000")
-        self._unlock()
-        del self._gsioc
+        self.rate = _parse_expression("0 mL/min")
+        try:
+            # Stop pump
+            self._gsioc.buffered_command("X000000")
+            self._unlock()
+        finally:
+            self._gsioc.close()  # give the shared bus back
+            del self._gsioc
 
     def _lock(self):
         self._gsioc.buffered_command("L")
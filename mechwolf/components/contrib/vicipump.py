@@ -1,5 +1,5 @@
 from ..stdlib.pump import Pump
-from . import _ureg
+from . import _parse_expression, _ureg
 
 
 class ViciPump(Pump):
@@ -31,9 +31,9 @@ class ViciPump(Pump):
 
     def __init__(self, serial_port, volume_per_rev, name=None):
         super().__init__(name=name)
-        self.rate = _ureg.parse_expression("0 ml/min")
+        self.rate = _parse_expression("0 ml/min")
         self.serial_port = serial_port
-        self.volume_per_rev = _ureg.parse_expression(volume_per_rev)
+        self.volume_per_rev = _parse_expression(volume_per_rev)
 
     def __enter__(self):
         import aioserial
@@ -50,7 +50,7 @@ class ViciPump(Pump):
         return self
 
     def __exit__(self, exc_type, exc_value, traceback):
-        self.rate = _ureg.parse_expression("0 mL/min")
+        self.rate = _parse_expression("0 mL/min")
         self._ser.write(b"SL 0\r\n")  # Stop pump
         del self._ser
 
@@ -1,4 +1,4 @@
-from .. import _ureg
+from .. import _parse_expression, _ureg
 
 from .component import Component
 from .active_component import ActiveComponent
@@ -1,12 +1,20 @@
 import asyncio
+import inspect
 from typing import Any, Dict, Optional
 
 from loguru import logger
 
-from . import _ureg
+from . import _parse_expression, _ureg
 from .component import Component
 
 
+async def _awaited(result, name: str):
+    """Awaits the result of calling a method that must be a coroutine function."""
+    if not inspect.isawaitable(result):
+        raise ValueError(f"{name} must be a coroutine function (use async def).")
+    return await result
+
+
 class ActiveComponent(Component):
     """
     A connected, controllable component.
@@ -27,6 +35,10 @@ class ActiveComponent(Component):
 
     _id_counter = 0
 
+    # internal values (unstable!)
+    _defer_connected_validation = False  # set by execution, which connects itself
+    _connected_validation_pending = False
+
     def __init__(self, name: Optional[str] = None):
         super().__init__(name=name)
         self._base_state: Dict[str, Any] = NotImplemented
@@ -37,6 +49,38 @@ class ActiveComponent(Component):
         At the end of a protocol and when not under explicit control by the user, the component will return to this state.
         """
 
+    def _resolve_params(self, params: dict) -> Dict[str, Any]:
+        """
+        Converts a dict of params into the values that the object's attributes will be set to.
+
+        Arguments:
+        - `params`: A dict whose keys are the strings of attribute names and values are the new values of the attribute.
+
+        Returns:
+        - A dict with the same keys as `params`, in which values for `pint.Quantity` attributes have been parsed.
+
+        Raises:
+        - `ValueError`: When a value cannot be parsed into the dimensionality of the attribute.
+        """
+        resolved = {}
+        for key, value in params.items():
+            current_value = getattr(self, key)
+            if isinstance(current_value, _ureg.Quantity) and not isinstance(
+                value, _ureg.Quantity
+            ):
+                try:
+                    value = _parse_expression(value)
+                    is_compatible = value.dimensionality == current_value.dimensionality
+                except AttributeError:
+                    is_compatible = False
+                if not is_compatible:
+                    raise ValueError(
+                        f"Invalid value {repr(params[key])} for {key} of {repr(self)}. "
+                        f"Expected a quantity of {current_value.dimensionality}."
+                    )
+            resolved[key] = value
+        return resolved
+
     def _update_from_params(self, params: dict) -> None:
         """
         Updates the attributes of the object from a dict.
@@ -44,11 +88,8 @@ class ActiveComponent(Component):
         Arguments:
         - `params`: A dict whose keys are the strings of attribute names and values are the new values of the attribute.
         """
-        for key, value in params.items():
-            if isinstance(getattr(self, key), _ureg.Quantity):
-                setattr(self, key, _ureg.parse_expression(value))
-            else:
-                setattr(self, key, value)
+        for key, value in self._resolve_params(params).items():
+            setattr(self, key, value)
 
     async def _update(self):
         raise NotImplementedError(f"Implement an _update() method for {repr(self)}.")
@@ -57,6 +98,9 @@ class ActiveComponent(Component):
         """
         Checks if a component's class is valid.
 
+        For real runs, the component's context is entered and `_validate_connected()` is run.
+        When executing a protocol, `_validate_connected()` is instead run later, over the connection used for execution.
+
         Arguments:
         - `dry_run`: Whether this is a validation check for a dry run. Ignores the actual executability of the component.
 
@@ -85,13 +129,13 @@ class ActiveComponent(Component):
             # dimensionality checking
             if isinstance(self.__dict__[k], _ureg.Quantity):
                 # figure out the dimensions we're comparing
-                expected_dim = _ureg.parse_expression(v).dimensionality
+                expected_dim = _parse_expression(v).dimensionality
                 actual_dim = self.__dict__[k].dimensionality
 
                 if expected_dim != actual_dim:
                     raise ValueError(
                         f"Invalid dimensionality in _base_state for {repr(self)}. "
-                        f"Got {_ureg.parse_expression(v).dimensionality} for {k}, "
+                        f"Got {_parse_expression(v).dimensionality} for {k}, "
                         f"expected {self.__dict__[k].dimensionality}"
                     )
 
@@ -103,12 +147,25 @@ class ActiveComponent(Component):
                 )
 
         # once we've checked everything, it should be good
-        if not dry_run:
-            self._update_from_params(self._base_state)
-            logger.trace(f"Attempting to call _update() for {repr(self)}.")
+        if not dry_run and self._defer_connected_validation:
+            self._connected_validation_pending = True
+        elif not dry_run:
             with self:
-                res = asyncio.run(self._update())
-                if res is not None:
-                    raise ValueError(f"Received return value {res} from update.")
+                asyncio.run(self._validate_connected())
 
         logger.debug(f"{repr(self)} is valid")
+
+    async def _validate_connected(self) -> None:
+        """
+        Checks that the component actually works by setting it to its base state.
+
+        Unlike `_validate()`, the component's context must already have been entered, so that the checks can reuse the connection used for execution.
+
+        Raises:
+        - `ValueError`: When `_update()` isn't a coroutine function or returns a value.
+        """
+        self._update_from_params(self._base_state)
+        logger.trace(f"Attempting to call _update() for {repr(self)}.")
+        res = await _awaited(self._update(), f"{repr(self)}._update()")
+        if res is not None:
+            raise ValueError(f"Received return value {res} from update.")
@@ -1,3 +1,5 @@
+import asyncio
+from concurrent.futures import Executor
 from typing import Optional, Set
 
 from loguru import logger
@@ -43,6 +45,36 @@ class Component(object):
         logger.trace(f"Exiting context for {self}")
         pass
 
+    async def __aenter__(self):
+        """
+        Enters the component's context without blocking the event loop.
+
+        By default, `__enter__` is run in a worker thread so that components can be connected to concurrently.
+        Components whose setup is natively async can override this instead.
+        """
+        await self._run_in_thread(self.__enter__)
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        """Exits the component's context without blocking the event loop. See `__aenter__`."""
+        await self._run_in_thread(self.__exit__, exc_type, exc_value, traceback)
+
+    @staticmethod
+    async def _run_in_thread(func, *args, executor: Optional[Executor] = None):
+        """Runs `func(*args)` in `executor` (the loop's default executor if `None`)."""
+        loop = asyncio.get_event_loop()
+
+        def run():
+            # objects created in the thread (like aioserial's locks) may look up the
+            # current event loop, which must be the one they'll be used from
+            asyncio.set_event_loop(loop)
+            try:
+                return func(*args)
+            finally:
+                asyncio.set_event_loop(None)
+
+        return await loop.run_in_executor(executor, run)
+
     def _validate(self, dry_run):
         """Components are valid for dry runs, but not for real runs."""
         if not dry_run:
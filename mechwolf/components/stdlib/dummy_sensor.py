@@ -16,8 +16,17 @@ class DummySensor(Sensor):
     - `rate`: Data collection rate in Hz as a `pint.Quanity`. A rate of 0 Hz corresponds to the sensor being off.
     """
 
-    def __init__(self, name: Optional[str] = None):
-        super().__init__(name=name)
+    def __init__(
+        self,
+        name: Optional[str] = None,
+        fixed_rate: bool = False,
+        skip_missed_samples: bool = False,
+    ):
+        super().__init__(
+            name=name,
+            fixed_rate=fixed_rate,
+            skip_missed_samples=skip_missed_samples,
+        )
         self._unit = "Dimensionless"
         self.counter = 0.0
 
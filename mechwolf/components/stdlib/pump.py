@@ -1,6 +1,6 @@
 from typing import Optional
 
-from . import _ureg
+from . import _parse_expression
 from .active_component import ActiveComponent
 
 
@@ -18,6 +18,6 @@ class Pump(ActiveComponent):
 
     def __init__(self, name: Optional[str] = None):
         super().__init__(name=name)
-        self.rate = _ureg.parse_expression("0 ml/min")
+        self.rate = _parse_expression("0 ml/min")
         self._visualization_shape = "box3d"
         self._base_state = dict(rate="0 mL/min")
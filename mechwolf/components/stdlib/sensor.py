@@ -1,12 +1,14 @@
 import asyncio
 import time
+from concurrent.futures import ThreadPoolExecutor
+from math import ceil
 from typing import TYPE_CHECKING, AsyncGenerator, Optional
 from warnings import warn
 
 from loguru import logger
 
-from . import _ureg
-from .active_component import ActiveComponent
+from . import _parse_expression
+from .active_component import ActiveComponent, _awaited
 
 if TYPE_CHECKING:
     import mechwolf
@@ -16,18 +18,80 @@ class Sensor(ActiveComponent):
     """
     A generic sensor.
 
+    By default, the sensor waits `1 / rate` after each read, so the actual sampling interval also includes the time taken by the read.
+    In fixed-rate mode, reads are instead scheduled on a fixed grid of deadlines (multiples of `1 / rate` since the start of the experiment), which keeps the time base stable.
+
+    Sensors whose drivers block should run their I/O with `_run_in_executor()`, which runs it on a dedicated worker thread for the sensor, so that the event loop (and every other component) isn't stalled.
+
+    Arguments:
+    - `name`: The name of the Sensor.
+    - `fixed_rate`: Whether to sample at fixed intervals from the start of the experiment.
+    - `skip_missed_samples`: In fixed-rate mode, what to do when the sensor falls more than a period behind schedule. If `True`, the missed deadlines are skipped. If `False`, the sensor reads back-to-back until it catches up.
+
     Attributes:
     - `name`: The name of the Sensor.
     - `rate`: Data collection rate in Hz as a `pint.Quantity`. A rate of 0 Hz corresponds to the sensor being off.
     """
 
-    def __init__(self, name: Optional[str] = None):
+    def __init__(
+        self,
+        name: Optional[str] = None,
+        fixed_rate: bool = False,
+        skip_missed_samples: bool = False,
+    ):
         super().__init__(name=name)
-        self.rate = _ureg.parse_expression("0 Hz")
+        self._rate_changed: Optional[asyncio.Event] = None  # set while monitoring
+        self.rate = _parse_expression("0 Hz")
         self._visualization_shape = "ellipse"
         self._unit: str = ""
         self._base_state = {"rate": "0 Hz"}
 
+        # fixed-rate sampling
+        self._fixed_rate = fixed_rate
+        self._skip_missed_samples = skip_missed_samples
+        self._late_samples = 0  # reads that started after their deadline
+        self._missed_samples = 0  # deadlines skipped to catch up
+        self._executor: Optional[ThreadPoolExecutor] = None  # created when first used
+
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+
+        # wake up the monitor loop if it's waiting for the sensor to be turned on
+        rate_changed = self.__dict__.get("_rate_changed")
+        if name == "rate" and rate_changed is not None:
+            rate_changed.set()
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        try:
+            await super().__aexit__(exc_type, exc_value, traceback)
+        finally:
+            self._shutdown_executor()
+
+    async def _run_in_executor(self, func, *args):
+        """
+        Runs a blocking call on the sensor's worker thread.
+
+        Calls are run one at a time, in order, always from the same thread, which many device drivers require.
+        The thread is started by the first call and stopped when the sensor's context is exited.
+
+        Arguments:
+        - `func`: The blocking function to call.
+        - `*args`: The arguments to call it with.
+
+        Returns:
+        - Whatever `func` returns.
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix=self.name
+            )
+        return await self._run_in_thread(func, *args, executor=self._executor)
+
+    def _shutdown_executor(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
     async def _read(self):
         """
         Collects the data.
@@ -43,38 +107,94 @@ class Sensor(ActiveComponent):
         If data collection is off and needs to be turned on, turn it on.
         If data collection is on and needs to be turned off, turn off and return data.
         """
-        while not experiment._end_loop:
-            # if the sensor is off, hand control back over
-            if not self.rate:
-                await asyncio.sleep(0)
-                continue
+        assert experiment._end_loop_event is not None  # make the type checker happy
+        self._rate_changed = asyncio.Event()
+        self._late_samples = self._missed_samples = 0
+
+        # the sampling period and index of the next deadline in fixed-rate mode
+        period: Optional[float] = None
+        tick = 0
 
-            if not dry_run:
-                yield {"data": await self._read(), "timestamp": time.time()}
-            else:
-                yield {"data": "simulated read", "timestamp": time.time()}
+        try:
+            while not experiment._end_loop:
+                # if the sensor is off, sleep until it's turned on or the experiment ends
+                if not self.rate:
+                    period = None
+                    await self._wait_until_on(experiment)
+                    continue
 
-            # then wait for the sensor's next read
-            if self.rate:
-                await asyncio.sleep(1 / self.rate.to_base_units().magnitude)
+                # wait for the next deadline, anchored to the start of the experiment
+                if self._fixed_rate:
+                    new_period = 1 / self.rate.to_base_units().magnitude
+                    if period != new_period:
+                        tick = ceil((time.time() - experiment.start_time) / new_period)
+                    period = new_period
 
+                    lag = time.time() - (experiment.start_time + tick * period)
+                    if lag < 0:
+                        await asyncio.sleep(-lag)
+                        # things might have changed while we were asleep
+                        if experiment._end_loop or not self.rate:
+                            continue
+                    else:
+                        self._late_samples += 1
+                        behind = int(lag // period)
+                        if behind and self._skip_missed_samples:
+                            logger.trace(f"{self} skipped {behind} sample(s).")
+                            self._missed_samples += behind
+                            tick += behind
+                    tick += 1
+
+                if not dry_run:
+                    yield {"data": await self._read(), "timestamp": time.time()}
+                else:
+                    yield {"data": "simulated read", "timestamp": time.time()}
+
+                # then wait for the sensor's next read
+                if self.rate and not self._fixed_rate:
+                    await asyncio.sleep(1 / self.rate.to_base_units().magnitude)
+        finally:
+            self._rate_changed = None
+
+        if self._late_samples:
+            logger.debug(
+                f"{self} read {self._late_samples} sample(s) late "
+                f"and skipped {self._missed_samples}."
+            )
         logger.debug(f"Monitor loop for {self} has completed.")
 
+    async def _wait_until_on(self, experiment: "mechwolf.Experiment") -> None:
+        """Sleeps until the sensor is turned on or the experiment ends."""
+        assert self._rate_changed is not None  # only called while monitoring
+        assert experiment._end_loop_event is not None
+        self._rate_changed.clear()
+        waiters = [
+            asyncio.ensure_future(self._rate_changed.wait()),
+            asyncio.ensure_future(experiment._end_loop_event.wait()),
+        ]
+        try:
+            await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for waiter in waiters:
+                waiter.cancel()
+
     def _validate(self, dry_run: bool) -> None:
-        logger.debug(f"Performing sensor specific checks for {self}...")
-        if not dry_run:
-            logger.trace(f"Executing Sensor-specific checks...")
-            logger.trace("Entering context...")
-            with self:
-                logger.trace("Context entered")
-                res = asyncio.run(self._read())
-                if not res:
-                    warn(
-                        "Sensor reads should probably return data. "
-                        f"Currently, {self}._read() does not return anything."
-                    )
+        try:
+            super()._validate(dry_run)
+        finally:
+            # validation runs in its own event loop, outside of the sensor's context
+            self._shutdown_executor()
+
+    async def _validate_connected(self) -> None:
+        logger.trace(f"Executing Sensor-specific checks for {self}...")
+        res = await _awaited(self._read(), f"{repr(self)}._read()")
+        if not res:
+            warn(
+                "Sensor reads should probably return data. "
+                f"Currently, {self}._read() does not return anything."
+            )
         logger.trace("Performing general component checks...")
-        super()._validate(dry_run=dry_run)
+        await super()._validate_connected()
 
     async def _update(self) -> None:
         # sensors don't have an update method; they implement read
@@ -1,6 +1,6 @@
 from typing import Optional
 
-from . import _ureg
+from . import _parse_expression
 from .active_component import ActiveComponent
 from .tube import Tube
 
@@ -24,7 +24,7 @@ class TempControl(ActiveComponent):
         super().__init__(name=name)
         if not isinstance(internal_tubing, Tube):
             raise TypeError("TempControl must have internal_tubing of type Tube.")
-        self.temp = _ureg.parse_expression("0 degC")
+        self.temp = _parse_expression("0 degC")
         self.active = False
 
         self._base_state = dict(temp="0 degC", active=False)
@@ -1,7 +1,7 @@
 from math import pi
 from warnings import warn
 
-from . import _ureg
+from . import _parse_expression, _ureg
 
 
 class Tube(object):
@@ -32,9 +32,9 @@ class Tube(object):
         The arguments to __init__ are `str`s, not `pint.Quantity`s.
         :::
         """
-        self.length = _ureg.parse_expression(length)
-        self.ID = _ureg.parse_expression(ID)
-        self.OD = _ureg.parse_expression(OD)
+        self.length = _parse_expression(length)
+        self.ID = _parse_expression(ID)
+        self.OD = _parse_expression(OD)
 
         # check to make sure units are valid
         for measurement in [self.length, self.ID, self.OD]:
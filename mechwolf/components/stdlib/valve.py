@@ -1,4 +1,4 @@
-from typing import Mapping, Optional
+from typing import Dict, Mapping, Optional, Tuple
 
 from .active_component import ActiveComponent, Component
 
@@ -12,11 +12,14 @@ class Valve(ActiveComponent):
     - `name`: The name of the valve.
 
     Attributes:
-    - `mapping`: The mapping from components to their integer port numbers.
+    - `mapping`: The mapping from components to their integer port numbers. To change it, assign a new mapping rather than modifying it in place, so that its indexes are rebuilt.
     - `name`: The name of the valve.
     - `setting`: The position of the valve as an int (mapped via `mapping`).
     """
 
+    # bumped whenever any valve's mapping is assigned (internal, unstable!)
+    _mapping_version = 0
+
     def __init__(
         self,
         mapping: Optional[Mapping[Component, int]] = None,
@@ -24,15 +27,45 @@ class Valve(ActiveComponent):
     ):
         super().__init__(name=name)
 
-        # check the mapping's type
-        if not isinstance(mapping, (type(None), Mapping)):
-            raise TypeError(f"Invalid mapping type {type(mapping)} for {repr(self)}.")
         self.mapping = mapping
         self.setting = 1
         self._visualization_shape = "parallelogram"
 
         self._base_state = {"setting": 1}
 
+    @property
+    def mapping(self) -> Optional[Mapping[Component, int]]:
+        return self._mapping
+
+    @mapping.setter
+    def mapping(self, mapping: Optional[Mapping[Component, int]]) -> None:
+        # check the mapping's type
+        if not isinstance(mapping, (type(None), Mapping)):
+            raise TypeError(f"Invalid mapping type {type(mapping)} for {repr(self)}.")
+        self._mapping = mapping
+        Valve._mapping_version += 1
+
+        # internal values (unstable!)
+        self._ports_by_name: Optional[Dict[str, int]] = None  # built when first used
+        self._components_by_port: Optional[Dict[int, Component]] = None
+
+    def _mapping_indexes(self) -> Tuple[Dict[str, int], Dict[int, Component]]:
+        """
+        Indexes the mapping for constant-time lookups in both directions.
+
+        The indexes are built on first use and rebuilt after `mapping` is reassigned.
+        If several components have the same name or port, the first one in the mapping wins.
+
+        Returns:
+        - A dict from the names of the mapped components to their ports and a dict from the ports to the components.
+        """
+        if self._ports_by_name is None or self._components_by_port is None:
+            self._ports_by_name, self._components_by_port = {}, {}
+            for component, port in (self._mapping or {}).items():
+                self._ports_by_name.setdefault(component.name, port)
+                self._components_by_port.setdefault(port, component)
+        return self._ports_by_name, self._components_by_port
+
     def _validate(self, dry_run):
         if not self.mapping:
             raise ValueError(f"{self} requires a mapping. None provided.")
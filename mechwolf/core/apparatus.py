@@ -1,16 +1,24 @@
 from collections import namedtuple
-from typing import Iterable, List, Mapping, Optional, Set, Union
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
 from warnings import warn
 
-import networkx as nx
-from graphviz import Digraph
-from IPython import get_ipython
-from IPython.display import Markdown
-from terminaltables import AsciiTable, GithubFlavoredMarkdownTable
-
-from .. import _ureg
+from .. import _get_ipython, _ureg
 from ..components import Component, Tube, Valve, Vessel
 
+if TYPE_CHECKING:
+    from graphviz import Digraph
+    from IPython.display import Markdown
+
 Connection = namedtuple("Connection", ["from_component", "to_component", "tube"])
 
 
@@ -49,6 +57,22 @@ class Apparatus(object):
             Apparatus._id_counter += 1
         self.description = description
 
+        # internal values (unstable!)
+        self._components_by_name: Dict[str, Component] = {}
+        # every component under its class and all of the class's bases
+        self._components_by_type: Dict[type, List[Component]] = {}
+        # the connections of the network as an ordered set, plus their adjacency
+        self._connections: Dict[Connection, None] = {}
+        self._outgoing: Dict[Component, List[Connection]] = {}
+        self._incoming: Dict[Component, List[Connection]] = {}
+        # a union-find of the components, to track connectivity as connections are added
+        self._parents: Dict[Component, Component] = {}
+        self._disjoint_sets = 0
+        # bumped on every change to the network so that validation can be cached
+        self._mutation_count = 0
+        # (key, problem) from the last _validate()
+        self._validity: Optional[Tuple[Tuple[int, int], Optional[str]]] = None
+
     def __repr__(self):
         return f"<Apparatus {self.name}>"
 
@@ -58,17 +82,11 @@ class Apparatus(object):
     def __getitem__(self, item):
         # when you pass a class
         if isinstance(item, type):
-            return [
-                component
-                for component in self.components
-                if isinstance(component, item)
-            ]
+            return list(self._components_by_type.get(item, []))
         elif isinstance(item, str):
             try:
-                return [
-                    component for component in self.components if component.name == item
-                ][0]
-            except IndexError:
+                return self._components_by_name[item]
+            except KeyError:
                 raise KeyError(f"No component named '{item}' in {repr(self)}.")
 
         # a shorthand way to check if a component is in the apparatus
@@ -93,34 +111,64 @@ class Apparatus(object):
             raise ValueError("Tube must be an instance of Tube")
 
         # check for duplicate names
-        try:
-            if self[from_component.name] is not from_component:
-                raise ValueError(f"Component {from_component} has duplicated name")
-        except KeyError:
-            pass
-        try:
-            if self[to_component.name] is not to_component:
-                raise ValueError(f"Component {to_component} has duplicated name")
-        except KeyError:
-            pass
-
-        if (
-            Connection(
-                from_component=from_component, to_component=to_component, tube=tube
-            )
-            in self.network
-        ):
+        for component in [from_component, to_component]:
+            if self._components_by_name.get(component.name, component) is not component:
+                raise ValueError(f"Component {component} has duplicated name")
+
+        connection = Connection(
+            from_component=from_component, to_component=to_component, tube=tube
+        )
+        if connection in self._connections:
             warn(
                 f"Duplicate connection from {from_component} to {to_component} omitted."
             )
             return
 
-        self.network.append(
-            Connection(
-                from_component=from_component, to_component=to_component, tube=tube
-            )
-        )
-        self.components.update([from_component, to_component])
+        self.network.append(connection)
+        self._connections[connection] = None
+        self._outgoing.setdefault(from_component, []).append(connection)
+        self._incoming.setdefault(to_component, []).append(connection)
+        for component in [from_component, to_component]:
+            self._add_component(component)
+        self._union(from_component, to_component)
+        self._mutation_count += 1
+
+    def _connections_from(self, component: Component) -> List[Connection]:
+        """Returns the connections whose flow originates at `component`, in the order they were added."""
+        return list(self._outgoing.get(component, []))
+
+    def _connections_to(self, component: Component) -> List[Connection]:
+        """Returns the connections whose flow goes to `component`, in the order they were added."""
+        return list(self._incoming.get(component, []))
+
+    def _add_component(self, component: Component) -> None:
+        """Adds a component to the apparatus's components and their indexes."""
+        if component in self.components:
+            return
+        self.components.add(component)
+        self._components_by_name[component.name] = component
+        for cls in type(component).__mro__:
+            self._components_by_type.setdefault(cls, []).append(component)
+        self._parents[component] = component
+        self._disjoint_sets += 1
+
+    def _find(self, component: Component) -> Component:
+        """Returns the representative of the set of components connected to `component`."""
+        root = component
+        while self._parents[root] is not root:
+            root = self._parents[root]
+
+        # compress the path so that later lookups are faster
+        while self._parents[component] is not root:
+            self._parents[component], component = root, self._parents[component]
+        return root
+
+    def _union(self, a: Component, b: Component) -> None:
+        """Merges the sets of components connected to `a` and `b`."""
+        root_a, root_b = self._find(a), self._find(b)
+        if root_a is not root_b:
+            self._parents[root_b] = root_a
+            self._disjoint_sets -= 1
 
     def add(
         self,
@@ -179,7 +227,7 @@ class Apparatus(object):
         file_format: str = "pdf",
         filename: Optional[str] = None,
         **kwargs,
-    ) -> Optional[Digraph]:
+    ) -> Optional["Digraph"]:
         """
         Generates a visualization of an apparatus's network graph.
 
@@ -196,6 +244,8 @@ class Apparatus(object):
         - `rankdir`: The direction of the graph. Use `LR` for left to right and `TD` for top down.
         - `title`: Whether to show the title in the output. Defaults to True. If a string, the title to use for the output.
         """
+        from graphviz import Digraph
+
         f = Digraph(
             name=self.name,
             node_attr=node_attr,
@@ -239,13 +289,13 @@ class Apparatus(object):
             title = title if isinstance(title, str) else self.name
             f.attr(label=title)
 
-        if get_ipython():
+        if _get_ipython():
             return f
         else:
             f.view(cleanup=True)
             return None
 
-    def summarize(self, style: str = "gfm") -> Optional[Markdown]:
+    def summarize(self, style: str = "gfm") -> Optional["Markdown"]:
         """
         Prints a summary table of the apparatus.
 
@@ -255,6 +305,7 @@ class Apparatus(object):
         Returns:
         - In Jupyter, a nice HTML table. Otherwise, the output is printed to the terminal.
         """
+        from terminaltables import AsciiTable, GithubFlavoredMarkdownTable
 
         if style == "ascii":
             tableStyle = AsciiTable
@@ -318,8 +369,10 @@ class Apparatus(object):
         tubing_table.title = "Tubing"
         tubing_table.inner_footing_row_border = "True"
 
-        if get_ipython():
+        if _get_ipython():
             if style == "gfm":
+                from IPython.display import Markdown
+
                 md = (
                     f"### {components_table.title}\n\n"
                     f"{components_table.table}\n\n"
@@ -345,51 +398,56 @@ class Apparatus(object):
         Returns:
         - Whether the apparatus is valid.
         """
+        # the result only changes if the network or a valve's mapping does
+        key = (self._mutation_count, Valve._mapping_version)
+        if self._validity is None or self._validity[0] != key:
+            self._validity = (key, self._find_problem(self[Valve]))
+
+        problem = self._validity[1]
+        if problem is not None:
+            warn(problem)
+            return False
+        return True
+
+    def _find_problem(self, valves: List[Valve]) -> Optional[str]:
+        """Returns why the apparatus is invalid, or `None` if it's valid."""
 
         # make sure that all of the components are connected
-        G = nx.Graph()  # convert the network to an undirected NetworkX graph
-        G.add_edges_from([(c.from_component, c.to_component) for c in self.network])
-        if not nx.is_connected(G):
-            warn("Not all components connected.")
-            return False
+        if self._disjoint_sets != 1:
+            return "Not all components connected."
 
         # valve checking
-        valves = [x for x in self.components if isinstance(x, Valve)]
         for valve in valves:
 
             # ensure that valve's mapping components are part of apparatus
             if isinstance(valve.mapping, Mapping):
                 for component in valve.mapping.keys():
                     if component not in self.components:
-                        warn(
+                        return (
                             f"Invalid mapping for Valve {valve}. "
                             f"{component} has not been added to {self.name}"
                         )
-                        return False
 
             # TODO: make this check work again with SISO, SIMO, MISO, and MIMO valves.
             # # no more than one output from a valve (might have to change this)
-            # if len([x for x in self.network if x.from_component is valve]) != 1:
-            #     warn(f"Valve {valve} has multiple outputs.")
-            #     return False
+            # if len(self._connections_from(valve)) != 1:
+            #     return f"Valve {valve} has multiple outputs."
             #
             # make sure valve's mapping is complete
             # non_mapped_components = [
             #     connection.from_component
-            #     for connection in self.network
-            #     if connection.to_component == valve
-            #     and valve.mapping.get(connection.from_component.name) is None
+            #     for connection in self._connections_to(valve)
+            #     if valve.mapping.get(connection.from_component.name) is None
             # ]
             # if non_mapped_components:
-            #     warn(
+            #     return (
             #         f"Valve {valve} has incomplete mapping."
             #         f" No mapping for {non_mapped_components}"
             #     )
-            #     return False
 
-        return True
+        return None
 
-    def describe(self) -> Union[str, Markdown]:
+    def describe(self) -> Union[str, "Markdown"]:
         """
         Generates a human-readable description of the apparatus.
 
@@ -426,6 +484,8 @@ class Apparatus(object):
                 f" {to_component} using {connection[2].material}"
                 f" tubing (length {tube.length}, ID {tube.ID}, OD {tube.OD}). "
             )
-        if get_ipython():
+        if _get_ipython():
+            from IPython.display import Markdown
+
             return Markdown(result)
         return result
@@ -0,0 +1,171 @@
+from array import array
+from collections import namedtuple
+from numbers import Integral, Real
+from typing import Any, Iterator, List, Union
+
+Datapoint = namedtuple("Datapoint", ["data", "timestamp", "experiment_elapsed_time"])
+
+
+def _is_int64(value) -> bool:
+    return isinstance(value, Integral) and -(2**63) <= int(value) < 2**63
+
+
+class SensorData(object):
+    """
+    The data collected from a single sensor, stored column-wise.
+
+    Timestamps and experiment elapsed times are kept in `array.array`s of doubles.
+    Numeric data is too, so each datapoint costs 24 bytes instead of a namedtuple and three Python objects.
+    Integer data is stored as 64-bit integers until the first non-integer arrives, at which point the column is promoted to doubles.
+    Any other data (such as the strings of a dry run) is kept in a plain list.
+
+    For compatibility, `SensorData` behaves like a list of `Datapoint` namedtuples, which are created on access.
+
+    Arguments:
+    - `datapoints`: The datapoints to initially store.
+    """
+
+    def __init__(self, datapoints=()):
+        self._timestamps = array("d")
+        self._elapsed_times = array("d")
+        self._data: Union[array, List[Any], None] = None  # created by the first append
+        for datapoint in datapoints:
+            self.append(datapoint)
+
+    def __repr__(self):
+        return f"<SensorData ({len(self)} datapoints)>"
+
+    def __len__(self) -> int:
+        return len(self._timestamps)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if self._data is None:
+            raise IndexError("SensorData index out of range")
+        return Datapoint(
+            data=self._data[index],
+            timestamp=self._timestamps[index],
+            experiment_elapsed_time=self._elapsed_times[index],
+        )
+
+    def __iter__(self) -> Iterator[Datapoint]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def __eq__(self, other):
+        try:
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        except TypeError:
+            return NotImplemented
+
+    def append(self, datapoint: Datapoint) -> None:
+        """Adds a `Datapoint` to the end of the columns."""
+        value = datapoint.data
+
+        if self._data is None:
+            self._data = self._new_column(value)
+        elif isinstance(self._data, array):
+            self._data = self._converted_column(self._data, value)
+
+        for column, x in [
+            (self._data, value),
+            (self._timestamps, datapoint.timestamp),
+            (self._elapsed_times, datapoint.experiment_elapsed_time),
+        ]:
+            try:
+                column.append(x)
+            except BufferError:
+                # a zero-copy export is holding onto the buffer, so copy the column
+                self._replace_column(column, x)
+
+    @staticmethod
+    def _new_column(value) -> Union[array, List[Any]]:
+        # bools are Integral, but should stay bools
+        if isinstance(value, bool):
+            return []
+        elif _is_int64(value):
+            return array("q")
+        elif isinstance(value, Real):
+            return array("d")
+        return []
+
+    @staticmethod
+    def _converted_column(column: array, value) -> Union[array, List[Any]]:
+        """Returns a column that is able to hold `value` in addition to `column`."""
+        if isinstance(value, bool):
+            return column.tolist()
+        elif column.typecode == "q":
+            if _is_int64(value):
+                return column
+            elif isinstance(value, Real) and not isinstance(value, Integral):
+                return array("d", column)
+            return column.tolist()
+        elif isinstance(value, Real):
+            return column
+        return column.tolist()
+
+    def _replace_column(self, column: array, value) -> None:
+        copied = array(column.typecode, column)
+        copied.append(value)
+        if column is self._data:
+            self._data = copied
+        elif column is self._timestamps:
+            self._timestamps = copied
+        else:
+            self._elapsed_times = copied
+
+    @property
+    def data(self) -> Union[array, List[Any]]:
+        """The column of data values."""
+        return self._data if self._data is not None else []
+
+    @property
+    def timestamps(self) -> array:
+        """The column of Unix timestamps."""
+        return self._timestamps
+
+    @property
+    def experiment_elapsed_times(self) -> array:
+        """The column of experiment elapsed times."""
+        return self._elapsed_times
+
+    def to_numpy(self):
+        """
+        Exports the data as NumPy arrays.
+
+        Numeric columns are exported without copying, as read-only views of the underlying storage.
+        Appending to the data after an export copies the columns instead of invalidating the views.
+
+        Returns:
+        - A dict of the `data`, `timestamp`, and `experiment_elapsed_time` arrays.
+        """
+        import numpy as np
+
+        def as_numpy(column):
+            if isinstance(column, array) and len(column):
+                exported = np.frombuffer(column, dtype=column.typecode)
+                exported.flags.writeable = False
+                return exported
+            elif isinstance(column, array):
+                return np.array([], dtype=column.typecode)
+            return np.array(column, dtype=object)
+
+        return {
+            "data": as_numpy(self.data),
+            "timestamp": as_numpy(self._timestamps),
+            "experiment_elapsed_time": as_numpy(self._elapsed_times),
+        }
+
+    def to_pandas(self):
+        """
+        Exports the data as a pandas DataFrame.
+
+        The DataFrame is built from `to_numpy()` without copying the numeric columns.
+
+        Returns:
+        - A `pandas.DataFrame` with `data`, `timestamp`, and `experiment_elapsed_time` columns.
+        """
+        import pandas as pd
+
+        return pd.DataFrame(self.to_numpy(), copy=False)
@@ -1,30 +1,36 @@
 import asyncio
+import heapq
+import sys
 import time
 import traceback
-from collections import namedtuple
-from contextlib import ExitStack
+from contextlib import asynccontextmanager
 from copy import deepcopy
 from time import asctime, localtime
-from typing import TYPE_CHECKING, Dict, Iterable, List, Union
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Sequence, TypeVar, Union
 
 from loguru import logger
 
 from .. import __version__
-from ..components import ActiveComponent, Sensor
+from ..components import ActiveComponent, Component, Sensor
+from .data import Datapoint
 
 # handle the hard issue of circular dependencies
 if TYPE_CHECKING:
     from .experiment import Experiment
 
-
-Datapoint = namedtuple("Datapoint", ["data", "timestamp", "experiment_elapsed_time"])
+C = TypeVar("C", bound=Component)
 
 
 class ProtocolCancelled(Exception):
     pass
 
 
-async def main(experiment: "Experiment", dry_run: Union[bool, int], strict: bool):
+async def main(
+    experiment: "Experiment",
+    dry_run: Union[bool, int],
+    strict: bool,
+    scheduler: str = "tasks",
+):
     """
     The function that actually does the execution of the protocol.
 
@@ -32,6 +38,7 @@ async def main(experiment: "Experiment", dry_run: Union[bool, int], strict: bool
     - `experiment`: The experiment to execute.
     - `dry_run`: Whether to simulate the experiment or actually perform it. If an integer greater than zero, the dry run will execute at that many times speed.
     - `strict`: Whether to stop execution upon any errors.
+    - `scheduler`: How to schedule the procedures. Either "tasks", which creates a task for each procedure, or "heap", which dispatches every procedure from a single task.
     """
 
     # logger.warning("Support for pausing execution is EXPERIMENTAL!")
@@ -40,17 +47,26 @@ async def main(experiment: "Experiment", dry_run: Union[bool, int], strict: bool
 
     tasks = []
 
+    # create the events used to wake up tasks when the experiment's state changes
+    experiment._bind_loop()
+
+    # a single task writes the data file, so that it's only opened once
+    data_writer = None
+    if experiment._data_file is not None:
+        data_writer = asyncio.ensure_future(experiment._write_data())
+
     # Run protocol
     # Enter context managers for each component (initialize serial ports, etc.)
-    # We can do this with contextlib.ExitStack on an arbitrary number of components
+    # Independent components are connected to (and disconnected from) concurrently
     try:
-        with ExitStack() as stack:
+        components = list(experiment._compiled_protocol.keys())
+        async with connect(components, dry_run=bool(dry_run)):
+            # check that the hardware works, reusing the connections made above
             if not dry_run:
-                components = []
-                for component in experiment._compiled_protocol.keys():
-                    components.append(stack.enter_context(component))
-            else:
-                components = list(experiment._compiled_protocol.keys())
+                await validate_components(
+                    [c for c in components if c._connected_validation_pending]
+                )
+
             for component in components:
                 # Find out when each component's monitoring should end
                 procedures: Iterable = experiment._compiled_protocol[component]
@@ -58,17 +74,18 @@ async def main(experiment: "Experiment", dry_run: Union[bool, int], strict: bool
                 end_time: float = max(end_times)  # we only want the last end time
                 logger.trace(f"Calculated end time for {component} as {end_time}s")
 
-                for procedure in experiment._compiled_protocol[component]:
-                    tasks.append(
-                        wait_and_execute_procedure(
-                            procedure=procedure,
-                            component=component,
-                            experiment=experiment,
-                            dry_run=dry_run,
-                            strict=strict,
+                if scheduler == "tasks":
+                    for procedure in experiment._compiled_protocol[component]:
+                        tasks.append(
+                            wait_and_execute_procedure(
+                                procedure=procedure,
+                                component=component,
+                                experiment=experiment,
+                                dry_run=dry_run,
+                                strict=strict,
+                            )
                         )
-                    )
-                logger.trace(f"Task list generated for {component}.")
+                    logger.trace(f"Task list generated for {component}.")
 
                 # for sensors, add the monitor task
                 if isinstance(component, Sensor):
@@ -77,6 +94,15 @@ async def main(experiment: "Experiment", dry_run: Union[bool, int], strict: bool
                 logger.debug(f"{component} is GO!")
             logger.debug(f"All components are GO!")
 
+            # a single task that dispatches every procedure
+            if scheduler == "heap":
+                tasks.append(
+                    dispatch_procedures(
+                        experiment=experiment, dry_run=dry_run, strict=strict
+                    )
+                )
+                logger.trace("Procedure dispatch task generated.")
+
             # Add a task to monitor the stop button
             tasks.append(check_if_cancelled(experiment))
             tasks.append(pause_handler(experiment, end_time, components))
@@ -136,22 +162,29 @@ async def main(experiment: "Experiment", dry_run: Union[bool, int], strict: bool
                 logger.success(end_msg)
 
             except RuntimeError as e:
+                experiment._error = e
                 logger.error(f"Got {repr(e)}. Full traceback is logged at trace level.")
                 logger.error("Protocol execution is stopping NOW!")
                 logger.critical(end_msg)
 
-            except ProtocolCancelled:
+            except ProtocolCancelled as e:
+                experiment._error = e
                 logger.error(f"Stop button pressed.")
                 logger.error("Protocol execution is stopping NOW!")
                 logger.critical(end_msg)
 
-            except Exception:
+            except Exception as e:
+                experiment._error = e
                 logger.trace(traceback.format_exc())
                 logger.error("Failed to execute protocol due to uncaught error!")
                 logger.error("Protocol execution is stopping NOW!")
                 logger.critical(end_msg)
     finally:
 
+        # write out any buffered data before reporting that we're done
+        if data_writer is not None:
+            await experiment._close_data_file(data_writer)
+
         # set some protocol metadata
         experiment.was_executed = True
         # after E.was_executed=True, we THEN log that we're cleaning up so it's shown
@@ -164,6 +197,154 @@ async def main(experiment: "Experiment", dry_run: Union[bool, int], strict: bool
             logger.remove(experiment._bound_logger)
 
 
+def _group_by_port(components: Iterable[C]) -> List[List[C]]:
+    """Groups components that share a serial port, since they have to take turns."""
+    groups: Dict[Any, List[C]] = {}
+    for component in components:
+        port = getattr(component, "serial_port", None)
+        groups.setdefault(component if port is None else ("port", port), []).append(
+            component
+        )
+    return list(groups.values())
+
+
+async def enter_contexts(components: Iterable[Component]) -> List[Component]:
+    """
+    Enters the contexts of the components concurrently.
+
+    Components that share a serial port are entered one at a time, in order.
+    If any component fails, the ones that were successfully entered are exited before the error is raised.
+
+    Returns:
+    - The components, in the order that their contexts were entered.
+    """
+    entered: List[Component] = []
+
+    async def enter_group(group: List[Component]) -> None:
+        for component in group:
+            start = time.time()
+            await component.__aenter__()
+            entered.append(component)
+            logger.debug(f"Connected to {component} in {time.time() - start:.3f}s")
+
+    start = time.time()
+    results = await asyncio.gather(
+        *[enter_group(group) for group in _group_by_port(components)],
+        return_exceptions=True,
+    )
+    errors = [result for result in results if isinstance(result, BaseException)]
+    if errors:
+        logger.error(f"Failed to connect to all components: {repr(errors[0])}")
+        error = errors[0]
+        await exit_contexts(entered, type(error), error, error.__traceback__)
+        raise error
+
+    logger.debug(
+        f"Connected to {len(entered)} components in {time.time() - start:.3f}s"
+    )
+    return entered
+
+
+async def exit_contexts(
+    components: List[Component], exc_type=None, exc_value=None, tb=None
+) -> None:
+    """
+    Exits the contexts of the components concurrently.
+
+    Components that share a serial port are exited one at a time, in the reverse of the order they were entered.
+    Every component is exited even if some of them fail, after which the first error is raised.
+    """
+
+    async def exit_group(group: List[Component]) -> None:
+        error = None
+        for component in reversed(group):
+            start = time.time()
+            try:
+                await component.__aexit__(exc_type, exc_value, tb)
+            except Exception as e:
+                logger.error(f"Failed to disconnect from {component}!")
+                error = error or e
+                continue
+            logger.debug(f"Disconnected from {component} in {time.time() - start:.3f}s")
+        if error is not None:
+            raise error
+
+    results = await asyncio.gather(
+        *[exit_group(group) for group in _group_by_port(components)],
+        return_exceptions=True,
+    )
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+
+
+def check_components(components: Iterable[ActiveComponent]) -> None:
+    """
+    Calls `_validate(dry_run=False)` for each component before a real run, without connecting to them.
+
+    Overrides of `_validate()` still run their own checks.
+    The hardware checks of `ActiveComponent._validate()` are left pending for `validate_components()`, which runs them once connected.
+
+    Raises:
+    - `RuntimeError`: When a component isn't valid.
+    """
+    for component in components:
+        component._defer_connected_validation = True
+        component._connected_validation_pending = False
+        try:
+            component._validate(dry_run=False)
+        except Exception as e:
+            raise RuntimeError(f"{component} isn't valid. Got error: '{str(e)}'.")
+        finally:
+            component._defer_connected_validation = False
+
+
+async def validate_components(components: Sequence[ActiveComponent]) -> None:
+    """
+    Checks that the components work with `ActiveComponent._validate_connected()`, concurrently.
+
+    The components' contexts must already have been entered.
+    Components that share a serial port are checked one at a time.
+
+    Raises:
+    - `RuntimeError`: When a component isn't valid.
+    """
+
+    async def validate_group(group: List[ActiveComponent]) -> None:
+        for component in group:
+            try:
+                await component._validate_connected()
+            except Exception as e:
+                raise RuntimeError(f"{component} isn't valid. Got error: '{str(e)}'.")
+
+    start = time.time()
+    results = await asyncio.gather(
+        *[validate_group(group) for group in _group_by_port(components)],
+        return_exceptions=True,
+    )
+    for result in results:
+        if isinstance(result, BaseException):
+            logger.error(str(result))
+            raise result
+    logger.debug(
+        f"Validated {len(components)} components in {time.time() - start:.3f}s"
+    )
+
+
+@asynccontextmanager
+async def connect(components: Sequence[Component], dry_run: bool):
+    """Holds the contexts of the components, unless it's a dry run."""
+    entered = [] if dry_run else await enter_contexts(components)
+    exc_info: tuple = (None, None, None)
+    try:
+        yield
+    except BaseException:
+        exc_info = sys.exc_info()
+        raise
+    finally:
+        await exit_contexts(entered, *exc_info)
+
+
 async def wait_and_execute_procedure(
     procedure,
     component: ActiveComponent,
@@ -175,9 +356,64 @@ async def wait_and_execute_procedure(
     # wait for the right moment
     params = procedure["params"]
     await wait(procedure["time"], experiment, f"Set {component} to {params}")
+    await execute_procedure(procedure, component, experiment, dry_run, strict)
+
+
+async def dispatch_procedures(
+    experiment: "Experiment", dry_run: Union[bool, int], strict: bool
+):
+    """
+    Executes every procedure of the compiled protocol from a single task.
+
+    Rather than one sleeping task per procedure, the procedures are kept in a time-ordered heap.
+    All of the procedures due at the same time are executed together as a batch.
+    """
 
+    async def execute_in_order(component, procedures):
+        for procedure in procedures:
+            await execute_procedure(procedure, component, experiment, dry_run, strict)
+
+    # the index breaks ties in time so that components are never compared
+    procedures = [
+        (component, procedure)
+        for component, compiled in experiment._compiled_protocol.items()
+        for procedure in compiled
+    ]
+    heap = [
+        (procedure["time"], i, component, procedure)
+        for i, (component, procedure) in enumerate(procedures)
+    ]
+    heapq.heapify(heap)
+    logger.trace(f"Scheduled {len(heap)} procedures.")
+
+    while heap:
+        # collect everything that's due at the next timestamp
+        due_time = heap[0][0]
+        batch: Dict[ActiveComponent, list] = {}
+        while heap and heap[0][0] == due_time:
+            _, _, component, procedure = heapq.heappop(heap)
+            batch.setdefault(component, []).append(procedure)
+
+        # components are updated concurrently, each in the order of its procedures
+        await wait(due_time, experiment, f"Procedures at {due_time}s")
+        await asyncio.gather(
+            *[execute_in_order(c, procedures) for c, procedures in batch.items()]
+        )
+
+
+async def execute_procedure(
+    procedure,
+    component: ActiveComponent,
+    experiment: "Experiment",
+    dry_run: Union[bool, int],
+    strict: bool,
+):
+    params = procedure["params"]
+
+    # the params were parsed during compilation, so this is just an assignment
     # NOTE: this doesn't actually call the _update() method
-    component._update_from_params(params)
+    for key, value in procedure["resolved_params"].items():
+        setattr(component, key, value)
     logger.trace(f"{component} object state updated to reflect new params.")
 
     if dry_run:
@@ -231,16 +467,31 @@ async def end_loop(experiment: "Experiment"):
     experiment._end_loop = True
 
 
+async def wait_for_any(*events: asyncio.Event) -> None:
+    """Waits until at least one of the events is set."""
+    waiters = [asyncio.ensure_future(event.wait()) for event in events]
+    try:
+        await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for waiter in waiters:
+            waiter.cancel()
+
+
 async def check_if_cancelled(experiment: "Experiment") -> None:
-    while not experiment._end_loop:
-        if experiment.cancelled:
-            raise ProtocolCancelled("protocol cancelled")
-        await asyncio.sleep(0)
+    assert experiment._cancelled_event is not None  # make the type checker happy
+    assert experiment._end_loop_event is not None
+    await wait_for_any(experiment._cancelled_event, experiment._end_loop_event)
+    if experiment.cancelled:
+        raise ProtocolCancelled("protocol cancelled")
 
 
 async def pause_handler(
     experiment: "Experiment", end_time: float, components: List[ActiveComponent]
 ) -> None:
+    assert experiment._paused_event is not None  # make the type checker happy
+    assert experiment._resumed_event is not None
+    assert experiment._end_loop_event is not None
+
     was_paused = False
     states: Dict[ActiveComponent, dict] = {}
     # this is either the planned duration of the experiment or cancellation
@@ -251,7 +502,10 @@ async def pause_handler(
             was_paused = True
             for component in components:
                 logger.debug(f"Pausing {component}.")
-                states[component] = deepcopy(component.__dict__)
+                # pausing only changes the attributes in the base state, so save those
+                states[component] = {
+                    k: deepcopy(getattr(component, k)) for k in component._base_state
+                }
                 component._update_from_params(component._base_state)
                 await component._update()
             logger.debug("All components set to base states.")
@@ -269,20 +523,27 @@ async def pause_handler(
             states = {}
             logger.debug("All components reset to state before pause.")
 
-        await asyncio.sleep(0)
+        # sleep until the pause button is hit or the experiment ends
+        await wait_for_any(
+            experiment._resumed_event if was_paused else experiment._paused_event,
+            experiment._end_loop_event,
+        )
 
 
 async def wait(duration: float, experiment: "Experiment", name: str):
-    """A pause-aware version of asyncio.sleep"""
+    """
+    A pause-aware version of asyncio.sleep.
+
+    Waits until `duration` seconds of (unpaused) experiment time have elapsed, so it can be awaited at any point during the experiment.
+    """
     if type(experiment.dry_run) == int:
         duration /= experiment.dry_run
-    await asyncio.sleep(duration)
-    logger.trace(f"<{name}> Just woke up from {duration}s nap")
 
     while True:
         # if, at the end of sleeping, the experiment is paused, wait for it to resume
         while experiment.paused:
-            await asyncio.sleep(0)
+            assert experiment._resumed_event is not None  # for the type checker
+            await experiment._resumed_event.wait()
         assert not experiment.paused
 
         # figure out how long we've been paused for
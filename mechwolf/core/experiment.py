@@ -2,27 +2,51 @@ import asyncio
 import json
 import os
 import time
+import traceback
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, Dict, List, Optional, Union
 from warnings import warn
 
 import aiofiles
-import ipywidgets as widgets
-from bokeh.io import output_notebook, push_notebook, show
-from bokeh.plotting import figure
-from bokeh.resources import INLINE
-from IPython import get_ipython
-from IPython.display import display
 from loguru import logger
 from xxhash import xxh32
 
+from .. import _get_ipython
 from ..components import ActiveComponent, Sensor
-from .execute import main
+from .data import SensorData
+from .execute import check_components, main
 
 # handle the hard issue of circular dependencies
 if TYPE_CHECKING:
     from .protocol import Protocol
-    from .execute import Datapoint
+
+
+def _decimate(x, y, n_buckets: int):
+    """
+    Reduces a series of points for plotting by keeping only the minimum and maximum of each of `n_buckets` equally sized buckets.
+
+    Unlike taking every nth point, this preserves spikes.
+
+    Arguments:
+    - `x`: A NumPy array of the points' x values.
+    - `y`: A NumPy array of the points' y values.
+    - `n_buckets`: The number of buckets to divide the points into.
+
+    Returns:
+    - The x and y values of the remaining points, in their original order.
+    """
+    import numpy as np
+
+    if len(x) <= 2 * n_buckets:
+        return x, y
+
+    edges = np.linspace(0, len(x), n_buckets + 1).astype(int)
+    keep = []
+    for start, stop in zip(edges[:-1], edges[1:]):
+        bucket = y[start:stop]
+        keep.extend([start + int(bucket.argmin()), start + int(bucket.argmax())])
+    indices = np.unique(keep)  # sorted, without the duplicates of flat buckets
+    return x[indices], y[indices]
 
 
 class Experiment(object):
@@ -39,7 +63,7 @@ class Experiment(object):
     - `apparatus`: The apparatus upon which the experiment is conducted.
     - `cancelled`: Whether the experiment is cancelled.
     - `compiled_protocol`: The results of `protocol._compile()`.
-    - `data`: A list of `Datapoint` namedtuples from the experiment's sensors.
+    - `data`: A dict mapping each sensor's name to its `SensorData`, which acts like a list of `Datapoint` namedtuples and can be exported with `to_numpy()` or `to_pandas()`.
     - `dry_run`: Whether the experiment is a dry run and, if so, by what factor it is sped up by.
     - `end_time`: The Unix time of the experiment's end.
     - `executed_procedures`: A list of the procedures that were executed during the experiment.
@@ -62,8 +86,8 @@ class Experiment(object):
         self.start_time: float  # hasn't started until main() is called
         self.created_time = time.time()  # when the object was created (might be diff)
         self.end_time: float
-        self.data: Dict[str, List[Datapoint]] = {}
-        self.cancelled = False
+        self.data: Dict[str, SensorData] = {}
+        self._cancelled = False
         self.was_executed = False
         self.executed_procedures: List[
             Dict[str, Union[float, Dict[str, Any], str, ActiveComponent]]
@@ -80,16 +104,29 @@ class Experiment(object):
         self._sensor_names: List[str] = [s.name for s in self._sensors]
         self._bound_logger = None
         self._plot_height = 300
+        self._plot_width = 600
+        self._plot_fps = 4.0  # how often to redraw the live plots
+        self._plot_rollover: Optional[int] = 100_000  # max points per plot
+        self._plot_max_points_per_frame = 2 * self._plot_width  # more get decimated
+        self._plot_refresher: Optional["asyncio.Future[None]"] = None
         self._is_executing = False
+        self._error: Optional[Exception] = None  # what stopped execution, if anything
         self._paused = False
         self._pause_times: List[Dict[str, float]] = []
-        self._end_loop = False  # when to stop monitoring the buttons
+        self._loop_ended = False  # when to stop monitoring the buttons
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._cancelled_event: Optional[asyncio.Event] = None
+        self._paused_event: Optional[asyncio.Event] = None
+        self._resumed_event: Optional[asyncio.Event] = None
+        self._end_loop_event: Optional[asyncio.Event] = None
         self._file_logger_id: Optional[int] = None
         self._log_file: Optional[Path] = None
         self._data_file: Optional[Path] = None
-        self._transformed_data: Dict[str, Dict[str, List[Datapoint]]] = {
-            s: {"datapoints": [], "timestamps": []} for s in self._sensor_names
-        }
+        self._data_buffer: List[str] = []  # lines waiting to be written to the file
+        self._data_buffer_size = 1000  # how many lines to buffer before flushing
+        self._data_flush_interval = 1.0  # the longest to wait between flushes (s)
+        self._data_flush_event: Optional[asyncio.Event] = None
+        self._data_file_closing = False
 
     def __str__(self):
         return f"Experiment {self.experiment_id}"
@@ -101,9 +138,10 @@ class Experiment(object):
 
         # If a chart has been registered to the device, update it.
         if device not in self.data:
-            self.data[device] = []
+            self.data[device] = SensorData()
         self.data[device].append(datapoint)
 
+        # buffer the line for the data file writer
         if self._data_file is not None:
             line = json.dumps(
                 {
@@ -111,16 +149,21 @@ class Experiment(object):
                     "timestamp": datapoint.timestamp,
                     "experiment_elapsed_time": datapoint.experiment_elapsed_time,
                     "data": datapoint.data,
-                    "unit": self.protocol.apparatus[device]._unit,
+                    "unit": self._device_name_to_unit[device],
                 }
             )
-            async with aiofiles.open(self._data_file, "a+") as f:
-                await f.write(line + "\n")
+            self._data_buffer.append(line + "\n")
+            if len(self._data_buffer) >= self._data_buffer_size:
+                self._signal(self._data_flush_event, True)
 
-        if get_ipython() is None:
+        if _get_ipython() is None:
             return
 
         if not self._graphs_shown:
+            from bokeh.io import output_notebook, show
+            from bokeh.plotting import figure
+            from bokeh.resources import INLINE
+
             logger.debug("Graphs not shown. Initializing...")
             for sensor, output in self._sensor_outputs.items():  # type: ignore
                 logger.trace(f"Initializing graph for {sensor}")
@@ -133,10 +176,10 @@ class Experiment(object):
                     p = figure(
                         title=f"{sensor} data",
                         plot_height=self._plot_height,
-                        plot_width=600,
+                        plot_width=self._plot_width,
                     )
                     r = p.line(
-                        source=self._transformed_data[sensor.name],
+                        source={"datapoints": [], "timestamps": []},
                         x="timestamps",
                         y="datapoints",
                         color="#2222aa",
@@ -155,19 +198,148 @@ class Experiment(object):
             logger.trace("All graphs successfully initialized")
             self._graphs_shown = True
 
-        if device in self._transformed_data:
-            target, r = self._charts[device]
-            self._transformed_data[device]["datapoints"].append(datapoint.data)
-            self._transformed_data[device]["timestamps"].append(
-                datapoint.experiment_elapsed_time
-            )
-            r.data_source.data["datapoints"] = self._transformed_data[device][
-                "datapoints"
-            ]
-            r.data_source.data["timestamps"] = self._transformed_data[device][
-                "timestamps"
-            ]
-            push_notebook(handle=target)
+            # the plots are redrawn by a separate task so that updates get coalesced
+            self._plot_refresher = asyncio.ensure_future(self._refresh_plots())
+
+    async def _refresh_plots(self) -> None:
+        """
+        Streams new sensor data to the live plots, `_plot_fps` times per second.
+
+        All of the datapoints since the last frame are sent at once.
+        If there are more than `_plot_max_points_per_frame` of them, only the minimum and maximum of each bucket of points are sent.
+        Each plot keeps at most the last `_plot_rollover` points.
+        """
+        from bokeh.io import push_notebook
+
+        assert self._end_loop_event is not None  # make the type checker happy
+
+        plotted = {device: 0 for device in self._charts}
+        try:
+            while True:
+                finished = self._end_loop
+
+                for device, (target, r) in self._charts.items():
+                    if (
+                        device not in self.data
+                        or len(self.data[device]) == plotted[device]
+                    ):
+                        continue
+
+                    # only get the new data
+                    new_points = self._new_plot_points(device, plotted[device])
+                    plotted[device] = len(self.data[device])
+
+                    r.data_source.stream(new_points, rollover=self._plot_rollover)
+                    push_notebook(handle=target)
+
+                # draw one last frame after the experiment is over
+                if finished:
+                    break
+                try:
+                    await asyncio.wait_for(
+                        self._end_loop_event.wait(), 1 / self._plot_fps
+                    )
+                except asyncio.TimeoutError:
+                    pass
+        except Exception:
+            logger.error("Failed to update the live plots!")
+            logger.trace(traceback.format_exc())
+
+    def _new_plot_points(self, device: str, start: int) -> Dict[str, list]:
+        """
+        Returns a device's datapoints from index `start` onwards, ready to stream to its plot.
+
+        The NumPy views of the data are dropped before returning.
+        While they're alive, every append to the data has to copy its columns.
+        """
+        columns = self.data[device].to_numpy()
+        x = columns["experiment_elapsed_time"][start:]
+        y = columns["data"][start:]
+
+        if len(x) > self._plot_max_points_per_frame and y.dtype != object:
+            x, y = _decimate(x, y, self._plot_max_points_per_frame // 2)
+        return {"timestamps": x.tolist(), "datapoints": y.tolist()}
+
+    def _bind_loop(self) -> None:
+        """
+        Creates the events used to signal changes in the experiment's state.
+
+        Must be called from inside the event loop that executes the experiment.
+        """
+        self._loop = asyncio.get_event_loop()
+        self._cancelled_event = asyncio.Event()
+        self._paused_event = asyncio.Event()
+        self._resumed_event = asyncio.Event()
+        self._end_loop_event = asyncio.Event()
+        self._data_flush_event = asyncio.Event()
+
+        # reflect the current state of the experiment
+        for event, is_set in [
+            (self._cancelled_event, self._cancelled),
+            (self._paused_event, self._paused),
+            (self._resumed_event, not self._paused),
+            (self._end_loop_event, self._loop_ended),
+        ]:
+            if is_set:
+                event.set()
+
+    def _signal(self, event: Optional[asyncio.Event], is_set: bool) -> None:
+        """Sets or clears an event. Safe to call from other threads and signal handlers."""
+        if event is None or self._loop is None or self._loop.is_closed():
+            return
+
+        # from inside the loop, the change must be visible immediately
+        try:
+            in_loop = asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            in_loop = False
+
+        if in_loop and is_set:
+            event.set()
+        elif in_loop:
+            event.clear()
+        else:
+            self._loop.call_soon_threadsafe(event.set if is_set else event.clear)
+
+    async def _write_data(self) -> None:
+        """
+        Appends the buffered data to the data file until the data file is closed.
+
+        The file is opened once and the buffer is flushed whenever it fills up or `_data_flush_interval` seconds have passed.
+        Call `_close_data_file()` to flush the remaining data and stop writing.
+        """
+        assert self._data_file is not None  # make the type checker happy
+        assert self._data_flush_event is not None
+
+        async with aiofiles.open(self._data_file, "a+") as f:
+            while True:
+                try:
+                    await asyncio.wait_for(
+                        self._data_flush_event.wait(), self._data_flush_interval
+                    )
+                except asyncio.TimeoutError:
+                    pass
+                self._data_flush_event.clear()
+
+                # swap out the buffer so that new data can keep coming in while writing
+                lines, self._data_buffer = self._data_buffer, []
+                if lines:
+                    await f.write("".join(lines))
+                    await f.flush()
+                    logger.trace(f"Wrote {len(lines)} lines to {self._data_file}")
+
+                if self._data_file_closing:
+                    break
+
+    async def _close_data_file(self, writer: "asyncio.Future[None]") -> None:
+        """Waits for the data file writer to write out the remaining data."""
+        self._data_file_closing = True
+        self._signal(self._data_flush_event, True)
+        try:
+            await writer
+        except Exception:
+            logger.error(f"Failed to write data to {self._data_file}!")
+            logger.trace(traceback.format_exc())
 
     def _on_stop_clicked(self, b):
         logger.debug("Stop button pressed.")
@@ -195,9 +367,25 @@ class Experiment(object):
         log_file_verbosity: Optional[str],
         log_file_compression: Optional[str],
         data_file: Union[str, bool, os.PathLike, None],
+        scheduler: str = "tasks",
+        plot_fps: float = 4.0,
+        plot_rollover: Optional[int] = 100_000,
     ):
         self.dry_run = dry_run
 
+        if scheduler not in ("tasks", "heap"):
+            raise ValueError(
+                f"Invalid scheduler {repr(scheduler)}. Must be 'tasks' or 'heap'."
+            )
+        if plot_fps <= 0:
+            raise ValueError(f"Invalid plot_fps {plot_fps}. Must be positive.")
+        if plot_rollover is not None and plot_rollover <= 0:
+            raise ValueError(
+                f"Invalid plot_rollover {plot_rollover}. Must be positive or None."
+            )
+        self._plot_fps = plot_fps
+        self._plot_rollover = plot_rollover
+
         # make the user confirm if it's the real deal
         if not self.dry_run and not confirm:
             confirmation = input(f"Execute? [y/N]: ").lower()
@@ -205,7 +393,10 @@ class Experiment(object):
                 logger.critical("Aborting execution...")
                 raise RuntimeError("Execution aborted by user.")
 
-        self._compiled_protocol = self.protocol._compile(dry_run=bool(dry_run))
+        # the hardware checks happen concurrently in main(), once connected
+        self._compiled_protocol = self.protocol._compile(dry_run=True, _resolve=True)
+        if not self.dry_run:
+            check_components(self._compiled_protocol)
 
         # now that we're ready to start, create the time and ID attributes
         protocol_hash: str = xxh32(str(self.protocol.yaml())).hexdigest()
@@ -265,13 +456,23 @@ class Experiment(object):
 
             self._data_file = self._data_file
 
-        if get_ipython():
+        if _get_ipython():
             self._display(verbosity=verbosity.upper(), strict=strict)
-            asyncio.ensure_future(main(experiment=self, dry_run=dry_run, strict=strict))
+            asyncio.ensure_future(
+                main(
+                    experiment=self, dry_run=dry_run, strict=strict, scheduler=scheduler
+                )
+            )
         else:
-            asyncio.run(main(experiment=self, dry_run=dry_run, strict=strict))
+            asyncio.run(
+                main(
+                    experiment=self, dry_run=dry_run, strict=strict, scheduler=scheduler
+                )
+            )
 
     def _display(self, verbosity: str, strict: bool):
+        import ipywidgets as widgets
+        from IPython.display import display
 
         # create pause button
         self._pause_button = widgets.Button(description="Pause", icon="pause")
@@ -383,11 +584,29 @@ class Experiment(object):
         # this deactivates sensor monitoring and button usability
         if not is_executing:
             self._end_loop = True
-            logger.trace(f"_end_loop for {self} is now True.")
 
         logger.trace(f"{repr(self)}.is_executing is now {is_executing}")
         self._is_executing = is_executing
 
+    @property
+    def cancelled(self):
+        return self._cancelled
+
+    @cancelled.setter
+    def cancelled(self, cancelled):
+        self._cancelled = cancelled
+        self._signal(self._cancelled_event, cancelled)
+
+    @property
+    def _end_loop(self):
+        return self._loop_ended
+
+    @_end_loop.setter
+    def _end_loop(self, end_loop):
+        self._loop_ended = end_loop
+        self._signal(self._end_loop_event, end_loop)
+        logger.trace(f"_end_loop for {self} is now {end_loop}.")
+
     @property
     def paused(self):
         return self._paused
@@ -410,6 +629,8 @@ class Experiment(object):
             self._pause_times[-1]["stop"] = time.time()
             logger.warning(f"Resumed execution.")
         self._paused = paused
+        self._signal(self._paused_event, paused)
+        self._signal(self._resumed_event, not paused)
 
         # control the pause button
         self._pause_button.description = "Resume" if paused else "Pause"
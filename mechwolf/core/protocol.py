@@ -1,23 +1,108 @@
 import json
 import os
+import re
+import sys
 from copy import deepcopy
 from datetime import timedelta
-from math import isclose
-from typing import Any, Dict, Iterable, List, Mapping, MutableMapping, Optional, Union
+from math import isclose, isnan
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    MutableMapping,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
 from warnings import warn
 
-import altair as alt
-import pandas as pd
-import yaml
-from IPython import get_ipython
-from IPython.display import Code
 from loguru import logger
 
-from .. import _ureg
+from .. import _get_ipython, _parse_expression, _ureg
 from ..components import ActiveComponent, TempControl, Valve
 from .apparatus import Apparatus
 from .experiment import Experiment
 
+if TYPE_CHECKING:
+    from IPython.display import Code
+
+
+def _seconds(time) -> Optional[float]:
+    """Converts a procedure's start or stop time to seconds."""
+    if time is None:
+        return None
+    elif isinstance(time, (int, float)):
+        return float(time)
+    elif isinstance(time, timedelta):
+        return time.total_seconds()
+    return float(_parse_expression(time).to("seconds").magnitude)
+
+
+def _seconds_column(times: Iterable) -> List[Optional[float]]:
+    """Converts a column of start or stop times to seconds, parsing each distinct string once."""
+    parsed: Dict[str, Optional[float]] = {}
+    seconds = []
+    for time in times:
+        if isinstance(time, str):
+            if time not in parsed:
+                parsed[time] = _seconds(time)
+            seconds.append(parsed[time])
+        else:
+            seconds.append(_seconds(time))
+    return seconds
+
+
+def _frame_seconds(column) -> List[Optional[float]]:
+    """Converts a pandas Series of start or stop times to seconds, vectorized where possible."""
+    import pandas as pd
+
+    if pd.api.types.is_timedelta64_dtype(column):
+        column = column.dt.total_seconds()
+    if pd.api.types.is_numeric_dtype(column):
+        return [None if isnan(x) else x for x in column.astype(float).tolist()]
+    return _seconds_column(None if _is_missing(x) else x for x in column)
+
+
+def _is_missing(value) -> bool:
+    """Whether a value from a pandas DataFrame is missing (`None`, NaN, NaT, or NA)."""
+    if value is None or (isinstance(value, float) and isnan(value)):
+        return True
+    pd = sys.modules.get("pandas")
+    return pd is not None and (value is pd.NA or value is pd.NaT)
+
+
+# a number followed by units, such as "5 mL/min"
+_QUANTITY = re.compile(r"\s*[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?(.*)")
+
+
+def _check_key(component: ActiveComponent, kwarg: str, value) -> Tuple:
+    """
+    Returns a key such that values with the same key are equally valid for a param.
+
+    Only the units of quantities are checked, so they're keyed by their units instead of their whole value.
+    """
+    if isinstance(value, str) and isinstance(
+        component.__dict__.get(kwarg), _ureg.Quantity
+    ):
+        match = _QUANTITY.fullmatch(value)
+        if match:
+            return (component, kwarg, str, match.group(1).strip())
+    # the type is part of the key since 1 == 1.0 == True
+    return (component, kwarg, type(value), value)
+
+
+class _CheckCache(NamedTuple):
+    """What has already been checked, so that a batch of procedures checks each thing once."""
+
+    components: Dict[Any, ActiveComponent]  # the components, by how they were given
+    settings: Dict[Tuple, Any]  # valve settings and the ports they map to
+    checked: Set[Optional[Tuple]]  # keys of the params that were already checked
+
 
 class Protocol(object):
     """
@@ -74,6 +159,11 @@ class Protocol(object):
             self.name = "Protocol_" + str(Protocol._id_counter)
             Protocol._id_counter += 1
 
+        # internal values (unstable!)
+        self._mutation_count = 0  # bumped whenever the procedures change
+        self._compile_cache: Dict[Tuple[int, bool, bool, bool], Dict] = {}
+        self._inferred_duration_cache: Optional[Tuple[int, float]] = None
+
         # default values
         self.procedures: List[
             Dict[str, Union[float, None, ActiveComponent, Dict[str, Any]]]
@@ -85,11 +175,28 @@ class Protocol(object):
     def __str__(self):
         return f"Protocol {self.name} defined over {repr(self.apparatus)}"
 
+    @property
+    def procedures(self):
+        return self._procedures
+
+    @procedures.setter
+    def procedures(self, procedures):
+        # replacing the procedures wholesale invalidates the compiled protocol too
+        self._procedures = procedures
+        self._mutated()
+
+    def _mutated(self) -> None:
+        """Invalidates the cached compilations of the protocol after a change."""
+        self._mutation_count += 1
+        self._compile_cache = {}
+        self._inferred_duration_cache = None
+
     def _check_added_valve_mapping(self, valve: Valve, **kwargs) -> dict:
         setting = kwargs["setting"]
 
         if valve.mapping is None:
             raise ValueError(f"{repr(valve)} does not have a mapping.")
+        ports_by_name, components_by_port = valve._mapping_indexes()
 
         # the valve itself was given
         if setting in valve.mapping:
@@ -99,13 +206,12 @@ class Protocol(object):
         # the valve's name was given
         # in this case, we get the mapped valve with that name
         # we don't have to worry about duplicate names since that's checked later
-        elif setting in [c.name for c in valve.mapping]:
+        elif setting in ports_by_name:
             logger.trace(f"{setting} in {repr(valve)}'s mapping.")
-            mapped_component = [c for c in valve.mapping if c.name == setting]
-            kwargs["setting"] = valve.mapping[mapped_component[0]]
+            kwargs["setting"] = ports_by_name[setting]
 
         # the user gave the actual port mapping number
-        elif setting in valve.mapping.values() and isinstance(setting, int):
+        elif isinstance(setting, int) and setting in components_by_port:
             logger.trace(f"User supplied manual setting for {valve}")
         else:
             raise ValueError(f"Invalid setting {setting} for {repr(valve)}.")
@@ -131,7 +237,7 @@ class Protocol(object):
             # for kwargs that will be converted later, just check that the units match
             if isinstance(component.__dict__[kwarg], _ureg.Quantity):
                 try:
-                    value_dim = _ureg.parse_expression(value).dimensionality
+                    value_dim = _parse_expression(value).dimensionality
                 except AttributeError:
                     value_dim = type(value)
                 kwarg_dim = component.__dict__[kwarg].dimensionality
@@ -150,81 +256,117 @@ class Protocol(object):
                 msg += f"{repr(value)}, which is of type {type(value)}."
                 raise ValueError(msg)
 
-    def _add_single(
-        self, component: ActiveComponent, start=None, stop=None, duration=None, **kwargs
-    ) -> None:
-        """Adds a single procedure to the protocol.
+    def _checked_procedure(
+        self,
+        component,
+        start: Optional[float],
+        stop: Optional[float],
+        params: Mapping[str, Any],
+        cache: Optional[_CheckCache] = None,
+    ) -> Dict[str, Any]:
+        """
+        Checks a procedure for `add()` or `add_many()`.
 
-        See add() for full documentation.
+        Arguments:
+        - `component`: The component, or its name.
+        - `start`: The start time in seconds. Defaults to the beginning of the protocol.
+        - `stop`: The stop time in seconds, if any.
+        - `params`: The state of the component for the procedure.
+        - `cache`: What earlier procedures in the same batch have already checked.
+
+        Returns:
+        - The procedure, as it's stored in `procedures`.
+
+        Raises:
+        - `KeyError`: The component isn't in the apparatus.
+        - `ValueError`: A param or time is invalid.
+        - `RuntimeError`: The procedure has no params.
         """
+        if cache is None:
+            cache = _CheckCache({}, {}, set())
 
         # make sure that the component being added is part of the apparatus
-        self.apparatus[component]
+        try:
+            component = cache.components[component]
+        except KeyError:
+            resolved = self.apparatus[component]
+            if not isinstance(resolved, ActiveComponent):
+                raise ValueError(f"{repr(component)} is not an ActiveComponent.")
+            cache.components[component] = component = resolved
 
         # don't let users give empty procedures
-        if not kwargs:
+        params = dict(params)
+        if not params:
             raise RuntimeError(
-                "No kwargs supplied. "
-                "This will not manipulate the state of your sythesizer. "
-                "Ensure your call to add() is valid."
+                f"No params supplied for {component}. "
+                "This will not manipulate the state of your sythesizer."
             )
 
-        # perform the mapping for valves
-        if isinstance(component, Valve):
-            kwargs = self._check_added_valve_mapping(component, **kwargs)
-
-        # make sure the component and keywords are valid
-        self._check_component_kwargs(component, **kwargs)
-
-        if stop is not None and duration is not None:
-            raise RuntimeError("Must provide one of stop and duration, not both.")
-
-        # parse the start time if given
-        if isinstance(start, timedelta):
-            start = str(start.total_seconds()) + " seconds"
-        elif start is None:  # default to the beginning of the protocol
-            start = "0 seconds"
-        start = _ureg.parse_expression(start)
-
-        # parse duration if given
-        if duration is not None:
-            if isinstance(duration, timedelta):
-                duration = str(duration.total_seconds()) + " seconds"
-            stop = start + _ureg.parse_expression(duration)
-        elif stop is not None:
-            if isinstance(stop, timedelta):
-                stop = str(stop.total_seconds()) + " seconds"
-            if isinstance(stop, str):
-                stop = _ureg.parse_expression(stop)
-
-        if stop is not None and start > stop:
-            raise ValueError("Procedure beginning is after procedure end.")
+        for kwarg, value in params.items():
+            # perform the mapping for valves, once per distinct setting
+            if isinstance(component, Valve) and kwarg == "setting":
+                key = (component, type(value), value)
+                if key not in cache.settings:
+                    cache.settings[key] = self._check_added_valve_mapping(
+                        component, setting=value
+                    )["setting"]
+                value = params[kwarg] = cache.settings[key]
+
+            # make sure the component and keywords are valid, once per check key
+            check_key: Optional[Tuple] = _check_key(component, kwarg, value)
+            try:
+                if check_key in cache.checked:
+                    continue
+            except TypeError:  # unhashable values can't be cached
+                check_key = None
+            self._check_component_kwargs(component, **{kwarg: value})
+            if check_key is not None:
+                cache.checked.add(check_key)
 
         # a little magic for temperature controllers
         if isinstance(component, TempControl):
-            if kwargs.get("temp") is not None and kwargs.get("active") is None:
-                kwargs["active"] = True
-            elif not kwargs.get("active") and kwargs.get("temp") is None:
-                kwargs["temp"] = "0 degC"
-            elif kwargs["active"] and kwargs.get("temp") is None:
+            if params.get("temp") is not None and params.get("active") is None:
+                params["active"] = True
+            elif not params.get("active") and params.get("temp") is None:
+                params["temp"] = "0 degC"
+            elif params["active"] and params.get("temp") is None:
                 raise RuntimeError(
                     f"TempControl {component} is activated but temperature "
-                    "setting is not given. Specify 'temp' in your call to add()."
+                    "setting is not given. Specify 'temp' in the procedure's params."
                 )
 
+        if start is None:  # default to the beginning of the protocol
+            start = 0.0
+        if stop is not None and start > stop:
+            raise ValueError("Procedure beginning is after procedure end.")
+
+        return dict(start=start, stop=stop, component=component, params=params)
+
+    def _add_single(
+        self, component: ActiveComponent, start=None, stop=None, duration=None, **kwargs
+    ) -> None:
+        """Adds a single procedure to the protocol.
+
+        See add() for full documentation.
+        """
+        if stop is not None and duration is not None:
+            raise RuntimeError("Must provide one of stop and duration, not both.")
+
+        # parse the times
+        start_seconds = _seconds(start) or 0.0
+        duration_seconds = _seconds(duration)
+        stop_seconds: Optional[float]
+        if duration_seconds is not None:
+            stop_seconds = start_seconds + duration_seconds
+        else:
+            stop_seconds = _seconds(stop)
+
         # add the procedure to the procedure list
-        self.procedures.append(
-            dict(
-                start=float(start.to_base_units().magnitude)
-                if start is not None
-                else start,
-                stop=float(stop.to_base_units().magnitude)
-                if stop is not None
-                else stop,
-                component=component,
-                params=kwargs,
-            )
+        procedure = self._checked_procedure(
+            component, start_seconds, stop_seconds, kwargs
         )
+        self._mutated()
+        self.procedures.append(procedure)
 
     def add(
         self,
@@ -241,6 +383,10 @@ class Protocol(object):
         If stop and duration are both `None`, the procedure's stop time will be inferred as the end of the protocol.
         :::
 
+        ::: tip
+        To add thousands of procedures, such as for a screen of conditions, `add_many()` is much faster.
+        :::
+
         Arguments:
         - `component_added`: The component(s) for which the procedure being added. If an interable, all components will have the same parameters.
         - `start`: The start time of the procedure relative to the start of the protocol, such as `"5 seconds"`. May also be a `datetime.timedelta`. Defaults to `"0 seconds"`, *i.e.* the beginning of the protocol.
@@ -264,41 +410,170 @@ class Protocol(object):
                 component, start=start, stop=stop, duration=duration, **kwargs
             )
 
+    def add_many(self, rows) -> None:
+        """
+        Adds many procedures at once.
+
+        This is much faster than calling `add()` for each procedure, which makes it suitable for generating large screens of conditions.
+        Each distinct component is looked up once and each param is checked once per distinct value (or, for quantities, per distinct unit).
+        Start and stop times are converted column by column.
+        The procedures are all checked before any are added, so the protocol is left unchanged if any are invalid.
+
+        Arguments:
+        - `rows`: The procedures, as any of:
+            - An iterable of `(component, start, stop, params)` tuples, where `params` is a dict of the component's state.
+            - An iterable of dicts with "component", "params", and optional "start" and "stop" keys, such as the output of `to_list()`.
+            - A pandas `DataFrame` with a "component" column, optional "start" and "stop" columns, and either a "params" column of dicts or one column per param. Missing values in param columns are skipped, so rows for different components can set different params.
+
+            Components may be given as objects or by name. Times are in seconds unless given as strings with units, such as `"5 min"`, or as `datetime.timedelta`s (or a `timedelta64` column). A start of `None` is the beginning of the protocol and a stop of `None` is inferred, as in `add()`.
+
+        Raises:
+        - `KeyError`: A component isn't in the apparatus.
+        - `ValueError`: A param or time is invalid.
+        - `RuntimeError`: A procedure has no params.
+        """
+        pd = sys.modules.get("pandas")  # a DataFrame means pandas was imported
+        if pd is not None and isinstance(rows, pd.DataFrame):
+            self._add_procedures(*self._frame_procedures(rows))
+            return
+
+        procedures = []
+        for row in rows:
+            if isinstance(row, Mapping):
+                procedures.append(row)
+            else:
+                component, start, stop, params = row
+                procedures.append(
+                    dict(component=component, start=start, stop=stop, params=params)
+                )
+        self._add_procedures(procedures)
+
+    @staticmethod
+    def _frame_procedures(frame) -> Tuple[List[Dict[str, Any]], List, List]:
+        """Splits a DataFrame for `add_many()` into procedures and their times."""
+        n_rows = len(frame)
+        starts = _frame_seconds(frame["start"]) if "start" in frame else [None] * n_rows
+        stops = _frame_seconds(frame["stop"]) if "stop" in frame else [None] * n_rows
+
+        if "params" in frame:
+            all_params = frame["params"].tolist()
+        else:
+            param_columns = [
+                column
+                for column in frame.columns
+                if column not in ("component", "start", "stop")
+            ]
+            columns = [frame[column].tolist() for column in param_columns]
+            all_params = [
+                {k: v for k, v in zip(param_columns, values) if not _is_missing(v)}
+                for values in (zip(*columns) if columns else [()] * n_rows)
+            ]
+
+        procedures = [
+            dict(component=component, params=params)
+            for component, params in zip(frame["component"].tolist(), all_params)
+        ]
+        return procedures, starts, stops
+
+    def _add_procedures(
+        self,
+        procedures: Iterable[Mapping[str, Any]],
+        starts: Optional[List[Optional[float]]] = None,
+        stops: Optional[List[Optional[float]]] = None,
+    ) -> None:
+        """
+        Adds many procedures at once, in the format output by `to_list()`. See `add_many()`.
+
+        Arguments:
+        - `procedures`: Dicts with "component", "params", and optional "start" and "stop" keys.
+        - `starts`: The start times in seconds, if already converted. Otherwise, they're taken from the procedures.
+        - `stops`: The stop times in seconds, if already converted. Otherwise, they're taken from the procedures.
+        """
+        procedures = list(procedures)
+        if starts is None:
+            starts = _seconds_column(p.get("start") for p in procedures)
+        if stops is None:
+            stops = _seconds_column(p.get("stop") for p in procedures)
+
+        cache = _CheckCache({}, {}, set())
+        added = [
+            self._checked_procedure(
+                procedure["component"], start, stop, procedure["params"], cache
+            )
+            for procedure, start, stop in zip(procedures, starts, stops)
+        ]
+
+        self._mutated()
+        self.procedures.extend(added)
+
     @property
     def _inferred_duration(self):
+        # reuse the last value if the protocol hasn't changed since it was computed
+        if (
+            self._inferred_duration_cache is not None
+            and self._inferred_duration_cache[0] == self._mutation_count
+        ):
+            return self._inferred_duration_cache[1]
+
         # infer the duration of the protocol
-        computed_durations = sorted(
-            [x["stop"] for x in self.procedures],
-            key=lambda z: z if z is not None else 0,
-        )
-        if all([x is None for x in computed_durations]):
+        computed_durations = [
+            x["stop"] for x in self.procedures if x["stop"] is not None
+        ]
+        if not computed_durations:
             raise RuntimeError(
                 "Unable to automatically infer duration of protocol. "
                 "Must define stop or duration for at least one procedure"
             )
-        return computed_durations[-1]
+        duration = max(computed_durations)
+        self._inferred_duration_cache = (self._mutation_count, duration)
+        return duration
 
     def _compile(
-        self, dry_run: bool = True, _visualization: bool = False
+        self,
+        dry_run: bool = True,
+        _visualization: bool = False,
+        _resolve: bool = False,
     ) -> Dict[ActiveComponent, List[Dict[str, Union[float, str, Dict[str, Any]]]]]:
         """
         Compile the protocol into a dict of devices and their procedures.
 
+        The result is cached until the protocol is next modified, so repeated calls are cheap.
+        Callers must not mutate the returned dict.
+
+        Arguments:
+        - `dry_run`: Whether to skip validating the components against the actual hardware.
+        - `_visualization`: Whether to output the start and stop times of each procedure instead of the times the component's state changes.
+        - `_resolve`: Whether to also convert each procedure's params into the final values of the component's attributes, as needed for execution.
+
         Returns:
         - A dict with components as the values and lists of their procedures as the value.
         The elements of the list of procedures are dicts with two keys: "time" in seconds, and "params", whose value is a dict of parameters for the procedure.
+        If `_resolve` is true, they also have "resolved_params", the params as parsed and validated by `ActiveComponent._resolve_params`.
 
         Raises:
         - `RuntimeError`: When compilation fails.
         """
+        # a compilation validated for a real run is just as good for a dry run
+        for cached_dry_run in (True, False) if dry_run else (False,):
+            key = (self._mutation_count, cached_dry_run, _visualization, _resolve)
+            if key in self._compile_cache:
+                logger.trace(f"Using cached compilation of {repr(self)}.")
+                return self._compile_cache[key]
+
         output = {}
 
+        # bucket the procedures by component in a single pass over the protocol
+        procedures_by_component: Dict[ActiveComponent, List[MutableMapping]] = {}
+        for procedure in self.procedures:
+            procedures_by_component.setdefault(procedure["component"], []).append(
+                procedure
+            )
+
         # deal only with compiling active components
         for component in self.apparatus[ActiveComponent]:
             # determine the procedures for each component
             component_procedures: List[MutableMapping] = sorted(
-                [x for x in self.procedures if x["component"] == component],
-                key=lambda x: x["start"],
+                procedures_by_component.get(component, []), key=lambda x: x["start"]
             )
 
             # skip compiling components without procedures
@@ -349,6 +624,7 @@ class Protocol(object):
                             f"as beginning of {procedure['component']}'s next procedure."
                         )
                         procedure["stop"] = next_start
+                        self._inferred_duration_cache = None
 
                     # check for overlapping procedures
                     elif next_start < procedure["stop"] and not isclose(
@@ -365,6 +641,7 @@ class Protocol(object):
                             f"To override, provide stop in your call to add()."
                         )
                         procedure["stop"] = self._inferred_duration
+                        self._inferred_duration_cache = None
 
             # give the component instructions at all times
             compiled = []
@@ -399,24 +676,45 @@ class Protocol(object):
                     }
                     compiled.append(new_state)
 
+            # parse the params now so that executing them is just an assignment
+            if _resolve and not _visualization:
+                resolved_base_state = component._resolve_params(component._base_state)
+                for step in compiled:
+                    if step["params"] is component._base_state:
+                        step["resolved_params"] = resolved_base_state
+                        continue
+                    try:
+                        step["resolved_params"] = component._resolve_params(
+                            step["params"]
+                        )
+                    except ValueError as e:
+                        raise RuntimeError(
+                            f"Invalid params {step['params']} for {component}. "
+                            f"Got error: '{str(e)}'."
+                        )
+
             output[component] = compiled
 
             # raise warning if duration is explicitly given but not used?
+
+        key = (self._mutation_count, dry_run, _visualization, _resolve)
+        self._compile_cache[key] = output
         return output
 
     def to_dict(self):
-        compiled = deepcopy(self._compile(dry_run=True))
-        compiled = {k.name: v for (k, v) in compiled.items()}
-        return compiled
+        compiled = self._compile(dry_run=True)
+        return {k.name: deepcopy(v) for (k, v) in compiled.items()}
 
     def to_list(self):
         output = []
-        for procedure in deepcopy(self.procedures):
+        for procedure in self.procedures:
+            # copy everything but the component itself, which is replaced by its name
+            procedure = dict(procedure, params=deepcopy(procedure["params"]))
             procedure["component"] = procedure["component"].name
             output.append(procedure)
         return output
 
-    def yaml(self) -> Union[str, Code]:
+    def yaml(self) -> Union[str, "Code"]:
         """
         Outputs the uncompiled procedures to YAML.
 
@@ -427,13 +725,17 @@ class Protocol(object):
         When in Jupyter, this string is wrapped in an `IPython.display.Code` object for nice syntax highlighting.
 
         """
+        import yaml
+
         compiled_yaml = yaml.safe_dump(self.to_list(), default_flow_style=False)
 
-        if get_ipython():
+        if _get_ipython():
+            from IPython.display import Code
+
             return Code(compiled_yaml, language="yaml")
         return compiled_yaml
 
-    def json(self) -> Union[str, Code]:
+    def json(self) -> Union[str, "Code"]:
         """
         Outputs the uncompiled procedures to JSON.
 
@@ -443,10 +745,136 @@ class Protocol(object):
         """
         compiled_json = json.dumps(self.to_list(), sort_keys=True, indent=4)
 
-        if get_ipython():
+        if _get_ipython():
+            from IPython.display import Code
+
             return Code(compiled_json, language="json")
         return compiled_json
 
+    @classmethod
+    def from_list(
+        cls,
+        apparatus: Apparatus,
+        procedures: Iterable[Mapping[str, Any]],
+        name: Optional[str] = None,
+        description: Optional[str] = None,
+    ) -> "Protocol":
+        """
+        Creates a protocol from a list of procedures, such as the output of `Protocol.to_list()`.
+
+        This is much faster than calling `add()` for each procedure. See `add_many()`.
+
+        Arguments:
+        - `apparatus`: The apparatus for which the protocol is being defined. Components are looked up in it by name.
+        - `procedures`: Dicts with "component" (a component or its name), "params", and optional "start" and "stop" times. Times are in seconds unless given as strings with units.
+        - `name`: The name of the protocol.
+        - `description`: A longer description of the protocol.
+
+        Returns:
+        - The protocol.
+
+        Raises:
+        - `KeyError`: A component isn't in the apparatus.
+        - `ValueError`: A param or time is invalid.
+        - `RuntimeError`: A procedure has no params.
+        """
+        P = cls(apparatus, name=name, description=description)
+        P._add_procedures(procedures)
+        return P
+
+    @classmethod
+    def from_dict(
+        cls,
+        apparatus: Apparatus,
+        protocol: Mapping[str, Any],
+        name: Optional[str] = None,
+        description: Optional[str] = None,
+    ) -> "Protocol":
+        """
+        Creates a protocol from a dict with a "procedures" list and an optional "name" and "description".
+
+        Arguments:
+        - `apparatus`: The apparatus for which the protocol is being defined.
+        - `protocol`: The dict. See `from_list()` for the format of the procedures.
+        - `name`: The name of the protocol, which overrides the one in the dict.
+        - `description`: A longer description of the protocol, which overrides the one in the dict.
+
+        Returns:
+        - The protocol.
+        """
+        return cls.from_list(
+            apparatus,
+            protocol["procedures"],
+            name=name if name is not None else protocol.get("name"),
+            description=description
+            if description is not None
+            else protocol.get("description"),
+        )
+
+    @classmethod
+    def _from_parsed(cls, apparatus: Apparatus, parsed, **kwargs) -> "Protocol":
+        if isinstance(parsed, Mapping):
+            return cls.from_dict(apparatus, parsed, **kwargs)
+        return cls.from_list(apparatus, parsed, **kwargs)
+
+    @classmethod
+    def from_json(
+        cls,
+        apparatus: Apparatus,
+        protocol: str,
+        name: Optional[str] = None,
+        description: Optional[str] = None,
+    ) -> "Protocol":
+        """
+        Creates a protocol from JSON, such as the output of `Protocol.json()`.
+
+        Arguments:
+        - `apparatus`: The apparatus for which the protocol is being defined.
+        - `protocol`: The JSON. Either a list of procedures, as for `from_list()`, or an object, as for `from_dict()`.
+        - `name`: The name of the protocol.
+        - `description`: A longer description of the protocol.
+
+        Returns:
+        - The protocol.
+        """
+        return cls._from_parsed(
+            apparatus, json.loads(protocol), name=name, description=description
+        )
+
+    @classmethod
+    def from_yaml(
+        cls,
+        apparatus: Apparatus,
+        protocol: str,
+        name: Optional[str] = None,
+        description: Optional[str] = None,
+    ) -> "Protocol":
+        """
+        Creates a protocol from YAML, such as the output of `Protocol.yaml()`.
+
+        The YAML is parsed with libyaml's C parser when PyYAML was built with it.
+        Even so, PyYAML takes far longer to parse a large protocol than `from_list()` takes to load it: for 50,000 procedures, it's slower than calling `add()` for each one.
+        Large protocols should be saved with `Protocol.json()` and loaded with `from_json()` instead.
+
+        Arguments:
+        - `apparatus`: The apparatus for which the protocol is being defined.
+        - `protocol`: The YAML. Either a list of procedures, as for `from_list()`, or a mapping, as for `from_dict()`.
+        - `name`: The name of the protocol.
+        - `description`: A longer description of the protocol.
+
+        Returns:
+        - The protocol.
+        """
+        import yaml
+
+        loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+        return cls._from_parsed(
+            apparatus,
+            yaml.load(protocol, Loader=loader),
+            name=name,
+            description=description,
+        )
+
     def visualize(self, legend: bool = False, width=500, renderer: str = "notebook"):
         """
         Generates a Gantt plot visualization of the protocol.
@@ -459,12 +887,18 @@ class Protocol(object):
         Returns:
         - An interactive visualization of the protocol.
         """
+        import altair as alt
+        import pandas as pd
 
         # don't try to render a visualization to the notebook if we're not in one
-        if get_ipython():
+        if _get_ipython():
             alt.renderers.enable(renderer)
 
-        for component, procedures in self._compile(_visualization=True).items():
+        compiled = self._compile(_visualization=True)
+        for component, compiled_procedures in compiled.items():
+            # the compilation is cached, so only modify copies of its procedures
+            procedures = [dict(procedure) for procedure in compiled_procedures]
+
             # generate a dict that will be a row in the dataframe
             for procedure in procedures:
                 procedure["component"] = str(component)
@@ -479,12 +913,9 @@ class Protocol(object):
                 # show what the valve is actually connecting to
                 if isinstance(component, Valve) and type(procedure["setting"]) == int:
                     assert isinstance(component.mapping, Mapping)
-                    # guess the component, c, which the valve is set to
-                    mapped_component = [
-                        repr(k)
-                        for k, v in component.mapping.items()
-                        if v == procedure["setting"]
-                    ][0]
+                    # look up the component, c, which the valve is set to
+                    _, components_by_port = component._mapping_indexes()
+                    mapped_component = repr(components_by_port[procedure["setting"]])
                     procedure["mapped component"] = mapped_component
                 # TODO: make this deterministic for color coordination
                 procedure["params"] = json.dumps(procedure["params"])
@@ -543,6 +974,9 @@ class Protocol(object):
         log_file_verbosity: Optional[str] = "trace",
         log_file_compression: Optional[str] = None,
         data_file: Union[str, bool, os.PathLike, None] = True,
+        scheduler: str = "tasks",
+        plot_fps: float = 4.0,
+        plot_rollover: Optional[int] = 100_000,
     ) -> Experiment:
         """
         Executes the procedure.
@@ -556,12 +990,17 @@ class Protocol(object):
         - `log_file_verbosity`: How verbose the logs in file should be. By default, it is "trace", which is the most verbose logging available. If `None`, it will use the same level as `verbosity`.
         - `log_file_compression`: Whether to compress the log file after the experiment.
         - `data_file`: The file to write the experimental data to during execution. If `True`, the data will be written to a file in `~/.mechwolf` with the filename `{experiment_id}.data.jsonl`. If falsey, no data will be written to the file.
+        - `scheduler`: How procedures are scheduled during execution. The default, "tasks", creates one task per procedure. "heap" dispatches all procedures from a single time-ordered queue, which uses far less memory for protocols with many procedures.
+        - `plot_fps`: How many times per second the live sensor plots in Jupyter are redrawn. Defaults to 4.
+        - `plot_rollover`: The most points each live sensor plot keeps. Older points are dropped from the plot, but not from the data. If `None`, every point is kept. Defaults to 100,000.
 
         Returns:
         - An `Experiment` object. In a Jupyter notebook, the object yields an interactive visualization. If protocol execution fails for any reason that does not raise an error, the return type is None.
 
         Raises:
         - `RuntimeError`: When attempting to execute a protocol on invalid components.
+        - `ValueError`: When the scheduler is not one of "tasks" or "heap".
+        - `ValueError`: When `plot_fps` is not positive, or `plot_rollover` is neither positive nor `None`.
         """
 
         # the Experiment object is going to hold all the info
@@ -575,6 +1014,9 @@ class Protocol(object):
             log_file_verbosity=log_file_verbosity,
             log_file_compression=log_file_compression,
             data_file=data_file,
+            scheduler=scheduler,
+            plot_fps=plot_fps,
+            plot_rollover=plot_rollover,
         )
 
         return E
@@ -27,7 +27,8 @@ setup(
         "Topic :: Scientific/Engineering :: Chemistry",
     ],
     python_requires=">=3.7",
-    packages=find_packages(),
+    packages=find_packages(exclude=["tests", "tests.*"]),
+    entry_points={"console_scripts": ["mechwolf=mechwolf.cli:main"]},
     tests_require=["pytest"],
     setup_requires=["pytest-runner"],
     install_requires=[
@@ -36,12 +37,12 @@ setup(
         "altair",
         "bokeh",
         "graphviz",
+        'importlib_metadata; python_version < "3.8"',
         "ipython>=7.0",
         "ipywidgets",
         "jupyter",
         "loguru",
         "nest_asyncio",
-        "networkx",
         "Pint",
         "PyYAML",
         "terminaltables",
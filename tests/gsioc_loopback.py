@@ -0,0 +1,95 @@
+import time
+from typing import Dict, Optional
+
+
+class LoopbackSerial(object):
+    """
+    A fake `aioserial.AioSerial` with simulated GSIOC devices on the other end of the bus, for the GSIOC tests and benchmark.
+
+    Every unit ID is present on every port. Immediate commands are answered with the command itself and buffered commands are recorded in `buses[port]["commands"]` as `(unit_id, command)` tuples.
+
+    Attributes:
+    - `buses`: The state of the simulated bus on each port, shared by all of the fake serial ports opened on it.
+    - `latency`: How long each write takes to be answered, in seconds.
+    """
+
+    buses: Dict[Optional[str], dict] = {}
+    latency = 0.0
+
+    def __init__(self, port=None, timeout=None, **kwargs):
+        self.port = port
+        self.timeout = timeout
+        self._bus = LoopbackSerial.buses.setdefault(
+            port,
+            {
+                "selected": None,
+                "buffering": None,  # the buffered command being received
+                "reply": b"",  # the rest of an immediate command's response
+                "output": bytearray(),
+                "commands": [],
+                "writes": 0,
+                "selections": 0,
+            },
+        )
+
+    def write(self, data) -> int:
+        time.sleep(self.latency)
+        for byte in bytes(data):
+            self._receive(byte)
+        self._bus["writes"] += 1
+        return len(data)
+
+    def read(self, size: int = 1) -> bytes:
+        output = self._bus["output"]
+        if not output and self.timeout:
+            time.sleep(self.timeout)  # a real read would time out
+        result = bytes(output[:size])
+        del output[:size]
+        return result
+
+    async def write_async(self, data) -> int:
+        return self.write(data)
+
+    async def read_async(self, size: int = 1) -> bytes:
+        return self.read(size)
+
+    def reset_input_buffer(self) -> None:
+        self._bus["output"].clear()
+
+    def close(self) -> None:
+        pass
+
+    @property
+    def in_waiting(self) -> int:
+        return len(self._bus["output"])
+
+    def _receive(self, byte: int) -> None:
+        bus = self._bus
+        if byte == 0xFF:
+            bus.update(selected=None, buffering=None, reply=b"")
+        elif bus["selected"] is None:
+            if byte >= 0x80:
+                bus["selected"] = byte - 0x80
+                bus["selections"] += 1
+                bus["output"].append(byte)
+        elif bus["buffering"] is not None:
+            bus["output"].append(byte)
+            if byte == ord("\r"):
+                bus["commands"].append((bus["selected"], bus["buffering"]))
+                bus["buffering"] = None
+            else:
+                bus["buffering"] += chr(byte)
+        elif byte == ord("\n"):
+            bus["output"].append(byte)
+            bus["buffering"] = ""
+        elif byte == 0x06 and bus["reply"]:
+            self._send_reply()
+        else:
+            bus["reply"] = bytes([byte])
+            self._send_reply()
+
+    def _send_reply(self) -> None:
+        bus = self._bus
+        char, bus["reply"] = bus["reply"][0], bus["reply"][1:]
+        # the last character of the response is shifted up by 128
+        bus["output"].append(char if bus["reply"] else char + 0x80)
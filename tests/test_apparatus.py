@@ -32,6 +32,43 @@ def test_add_multiple():
     assert B.network == [(a, d, t), (b, d, t), (c, d, t)]
 
 
+def test_connections():
+    B = mw.Apparatus()
+    B.add([a, b], c, t)
+    B.add(c, d, t)
+    with pytest.warns(UserWarning, match="Duplicate connection"):
+        B.add(a, c, t)
+    assert B.network == [(a, c, t), (b, c, t), (c, d, t)]
+    assert B._connections_to(c) == [(a, c, t), (b, c, t)]
+    assert B._connections_from(c) == [(c, d, t)]
+    assert B._connections_from(d) == []
+
+
+def test_getitem():
+    B = mw.Apparatus()
+    pump = mw.DummyPump(name="pump")
+    sensor = mw.DummySensor(name="sensor")
+    B.add([a, pump], sensor, t)
+
+    assert B["pump"] is pump
+    assert B[sensor] is sensor
+    assert B[mw.Pump] == [pump]
+    assert set(B[mw.ActiveComponent]) == {pump, sensor}
+    assert set(B[mw.Component]) == {a, pump, sensor}
+    assert B[mw.Valve] == []
+    with pytest.raises(KeyError):
+        B["not a component"]
+
+    # the returned lists are copies
+    B[mw.Pump].clear()
+    assert B[mw.Pump] == [pump]
+
+    # names must be unique
+    with pytest.raises(ValueError, match="duplicated name"):
+        B.add(mw.DummyPump(name="pump"), sensor, t)
+    assert B[mw.Pump] == [pump]
+
+
 def test__validate():
     # test network connectivity checking
     assert A._validate()
@@ -43,6 +80,31 @@ def test__validate():
     assert A._validate()
 
 
+def test__validate_cache():
+    with pytest.warns(UserWarning, match="connect"):
+        assert not mw.Apparatus()._validate()  # empty
+
+    B = mw.Apparatus()
+    valve = mw.Valve(mapping={a: 1})
+    B.add(a, valve, t)
+    assert B._validate()
+    key = B._validity[0]
+    assert B._validate()
+    assert B._validity[0] == key  # unchanged, so not revalidated
+
+    # changes to the valve's mapping invalidate the cache
+    valve.mapping = {a: 1, c: 2}
+    with pytest.warns(UserWarning, match="Invalid mapping"):
+        assert not B._validate()
+    # and so do changes to the network
+    B.add(c, valve, t)
+    assert B._validate()
+    B.add(d, b, t)
+    with pytest.warns(UserWarning, match="connect"):
+        assert not B._validate()
+        assert not B._validate()  # warns again when cached
+
+
 def test_describe():
     C = mw.Apparatus()
     C.add(mw.Vessel("water"), b, t)
@@ -0,0 +1,102 @@
+import asyncio
+from types import SimpleNamespace
+
+import mechwolf as mw
+from mechwolf.components.contrib.arduino import ArduinoSensor
+
+
+class StreamingSerial(object):
+    """A fake serial port with an Arduino pushing samples on the other end."""
+
+    def __init__(self, chunks):
+        self.chunks = list(chunks)
+        self.writes = []
+        self.cancelled_reads = 0
+
+    @property
+    def in_waiting(self):
+        return len(self.chunks[0]) if self.chunks else 0
+
+    def read(self, size):
+        assert size == len(self.chunks[0])
+        return self.chunks.pop(0)
+
+    async def read_async(self, size):
+        if not self.chunks:
+            await asyncio.Event().wait()  # nothing else is coming
+        data, self.chunks[0] = self.chunks[0][:size], self.chunks[0][size:]
+        if not self.chunks[0]:
+            self.chunks.pop(0)
+        return data
+
+    def cancel_read(self):
+        self.cancelled_reads += 1
+
+    def reset_input_buffer(self):
+        pass
+
+    async def write_async(self, data):
+        self.writes.append(data)
+
+
+async def collect(sensor, duration):
+    experiment = SimpleNamespace(_end_loop=False, _end_loop_event=asyncio.Event())
+
+    async def stop():
+        await asyncio.sleep(duration)
+        experiment._end_loop = True
+        experiment._end_loop_event.set()
+
+    stopper = asyncio.ensure_future(stop())
+    results = [result async for result in sensor._monitor(experiment)]
+    await stopper
+    return results
+
+
+def test_streaming():
+    sensor = ArduinoSensor(
+        serial_port="fake", streaming=True, stream_command="s", stop_command="x"
+    )
+    sensor.rate = mw._parse_expression("1 Hz")
+
+    # lines can be split across reads, and the first one is skipped as it may be partial
+    sensor.ser = StreamingSerial([b"23\n1\n2", b"\n3.5\nnot a number\n", b"4\n"])
+    results = asyncio.run(collect(sensor, 0.2))
+    assert [x["data"] for x in results] == [1, 2, 3.5, 4]
+    assert sensor.ser.writes == [b"s", b"x"]
+
+    # when the buffer is full, the oldest samples are dropped
+    sensor = ArduinoSensor(serial_port="fake", streaming=True, buffer_size=2)
+    sensor.rate = mw._parse_expression("1 Hz")
+    sensor.ser = StreamingSerial([b"1\n2\n3\n4\n"])
+    results = asyncio.run(collect(sensor, 0.2))
+    assert [x["data"] for x in results] == [3, 4]
+    assert sensor._dropped_samples == 1
+    assert sensor.ser.writes == []
+
+    # the port isn't read while the sensor is off
+    sensor = ArduinoSensor(serial_port="fake", streaming=True, stream_command="s")
+    sensor.ser = StreamingSerial([b"1\n2\n3\n4\n"])
+    assert asyncio.run(collect(sensor, 0.2)) == []
+    assert sensor.ser.chunks == [b"1\n2\n3\n4\n"] and sensor.ser.writes == []
+
+    # the stream is started when the sensor is turned on and stopped when it's turned off
+    sensor = ArduinoSensor(
+        serial_port="fake", streaming=True, stream_command="s", stop_command="x"
+    )
+    sensor.ser = StreamingSerial([b"1\n2\n"])
+
+    async def toggle():
+        for rate in ["1 Hz", "0 Hz"]:
+            await asyncio.sleep(0.1)
+            sensor.rate = mw._parse_expression(rate)
+
+    async def collect_while_toggling():
+        toggler = asyncio.ensure_future(toggle())
+        results = await collect(sensor, 0.4)
+        await toggler
+        return results
+
+    assert [x["data"] for x in asyncio.run(collect_while_toggling())] == [2]
+    assert sensor.ser.writes == [b"s", b"x"]
+    assert sensor.ser.cancelled_reads == 1
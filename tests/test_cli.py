@@ -0,0 +1,75 @@
+import os
+import signal
+
+import pytest
+
+import mechwolf as mw
+from mechwolf import cli
+
+APPARATUS = """
+import mechwolf as mw
+
+pump = mw.DummyPump(name="pump")
+sensor = mw.DummySensor(name="sensor")
+broken = mw.BrokenDummySensor(name="broken")
+tube = mw.Tube("1 foot", "1/16 in", "2/16 in", "PVC")
+
+A = mw.Apparatus()
+A.add(pump, [sensor, broken], tube)
+"""
+
+PROTOCOL = """
+- component: pump
+  params:
+    rate: 5 mL/min
+  start: 0.0
+  stop: {stop}
+- component: {sensor}
+  params:
+    rate: 50 Hz
+  start: 0.0
+  stop: {stop}
+"""
+
+
+@pytest.fixture
+def run(tmp_path):
+    apparatus = tmp_path / "apparatus.py"
+    apparatus.write_text(APPARATUS)
+
+    def run(*args, sensor="sensor", stop=1.0, protocol=PROTOCOL):
+        protocol_file = tmp_path / "protocol.yaml"
+        protocol_file.write_text(protocol.format(sensor=sensor, stop=stop))
+        data_file = tmp_path / "data.jsonl"
+        return cli.main(
+            ["run", str(apparatus), str(protocol_file), "--log-file", "none"]
+            + ["--data-file", str(data_file), *args]
+        )
+
+    return run
+
+
+def test_run(run, tmp_path):
+    assert run("--dry-run", "5") == cli.EXIT_SUCCESS
+    assert run() == cli.EXIT_SUCCESS
+    assert (tmp_path / "data.jsonl").read_text().count("\n") >= 50
+
+
+def test_exit_statuses(run, monkeypatch):
+    # the broken sensor fails during execution
+    assert run(sensor="broken") == cli.EXIT_FAILURE
+
+    # an unknown component
+    assert run(sensor="missing") == cli.EXIT_INVALID
+
+    # the protocol is stopped by a signal, sent once the pump has been turned on
+    async def interrupt(pump):
+        if pump.rate:
+            os.kill(os.getpid(), signal.SIGTERM)
+
+    monkeypatch.setattr(mw.DummyPump, "_update", interrupt)
+    assert run(stop=60.0) == cli.EXIT_CANCELLED
+    assert signal.getsignal(signal.SIGTERM) is signal.SIG_DFL
+
+    with pytest.raises(SystemExit):
+        cli.main(["run"])
@@ -0,0 +1,47 @@
+import numpy as np
+
+from mechwolf.core.data import Datapoint, SensorData
+
+
+def datapoints(values):
+    return [
+        Datapoint(data=v, timestamp=100.0 + i, experiment_elapsed_time=float(i))
+        for i, v in enumerate(values)
+    ]
+
+
+def test_list_compatibility():
+    points = datapoints([1.5, 2.5, 3.5])
+    data = SensorData(points)
+    assert len(data) == 3
+    assert data[0] == points[0]
+    assert data[-1].data == 3.5
+    assert data[1:] == points[1:]
+    assert list(data) == points
+    assert data == points
+
+
+def test_column_types():
+    assert SensorData(datapoints([1, 2])).data.typecode == "q"
+    assert SensorData(datapoints([1, 2.5])).data.typecode == "d"
+    assert SensorData(datapoints([1, 2.5]))[0].data == 1.0
+    assert SensorData(datapoints([1.0, "x"])).data == [1.0, "x"]
+    assert SensorData(datapoints([True, False]))[0].data is True
+    assert SensorData(datapoints([1, 2**70]))[1].data == 2**70
+    assert SensorData(datapoints(["simulated read"]))[0].data == "simulated read"
+
+
+def test_zero_copy_export():
+    data = SensorData(datapoints([1.0, 2.0]))
+    exported = data.to_numpy()
+    assert np.shares_memory(exported["data"], np.frombuffer(data.data))
+    assert not exported["data"].flags.writeable
+
+    # appending after an export leaves the exported views intact
+    data.append(Datapoint(data=3.0, timestamp=102.0, experiment_elapsed_time=2.0))
+    assert list(exported["data"]) == [1.0, 2.0]
+    assert list(data.to_numpy()["data"]) == [1.0, 2.0, 3.0]
+
+    df = data.to_pandas()
+    assert list(df.columns) == ["data", "timestamp", "experiment_elapsed_time"]
+    assert df["experiment_elapsed_time"].tolist() == [0.0, 1.0, 2.0]
@@ -1,4 +1,13 @@
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
 import mechwolf as mw
+from mechwolf.components.stdlib import sensor as sensor_module
 
 # create components
 a = mw.Vessel(name="a", description="nothing")
@@ -35,3 +44,205 @@ for dry_run in [True, False]:
 # test fast forward
 E = P.execute(confirm=True, dry_run=5, log_file=None, data_file=None)
 assert len(E.data["test"]) >= 1
+
+
+def test_heap_scheduler():
+    E = P.execute(
+        confirm=True, dry_run=True, log_file=None, data_file=None, scheduler="heap"
+    )
+    assert len(E.data["test"]) >= 5
+    assert len(E.executed_procedures) == sum(
+        len(procedures) for procedures in E._compiled_protocol.values()
+    )
+    assert pump.rate == mw._ureg.parse_expression(pump._base_state["rate"])
+
+
+def test_plot_options():
+    E = P.execute(
+        confirm=True,
+        dry_run=True,
+        log_file=None,
+        data_file=None,
+        plot_fps=10,
+        plot_rollover=None,
+    )
+    assert E._plot_fps == 10
+    assert E._plot_rollover is None
+
+    with pytest.raises(ValueError):
+        P.execute(confirm=True, dry_run=True, plot_fps=0)
+    with pytest.raises(ValueError):
+        P.execute(confirm=True, dry_run=True, plot_rollover=0)
+
+
+def test_idle_cpu_usage():
+    # an hour of doing nothing, simulated in a couple of seconds
+    idle_sensor = mw.DummySensor(name="idle sensor")
+    B = mw.Apparatus()
+    B.add(a, idle_sensor, tube)
+    P = mw.Protocol(B)
+    P.add(idle_sensor, rate="0 Hz", duration="1 hour")
+
+    wall_start, cpu_start = time.time(), time.process_time()
+    P.execute(confirm=True, dry_run=1800, log_file=None, data_file=None)
+    wall_time, cpu_time = time.time() - wall_start, time.process_time() - cpu_start
+
+    # busy waiting would pin the CPU for the entire run
+    assert cpu_time < 0.25 * wall_time
+
+
+class SlowDummySensor(mw.DummySensor):
+    async def _read(self):
+        await asyncio.sleep(0.05)  # a slow read
+        return await super()._read()
+
+
+class FakeClock(object):
+    """A clock that only moves when something sleeps, so that timings are exact."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.now += max(seconds, 0)
+        await FakeClock._sleep(0)
+
+    _sleep = staticmethod(asyncio.sleep)
+
+
+async def sample(sensor, n, clock):
+    # the experiment started just before the sensor's monitor
+    experiment = SimpleNamespace(
+        _end_loop=False, _end_loop_event=asyncio.Event(), start_time=clock.now - 0.001
+    )
+    monitor = sensor._monitor(experiment)
+    timestamps = [(await monitor.__anext__())["timestamp"] for _ in range(n)]
+    await monitor.aclose()
+    return timestamps
+
+
+def test_fixed_rate_sampling(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(sensor_module, "time", clock)
+    monkeypatch.setattr(asyncio, "sleep", clock.sleep)
+
+    drifting = SlowDummySensor(name="drifting")
+    fixed = SlowDummySensor(name="fixed", fixed_rate=True)
+    for sensor in [drifting, fixed]:
+        sensor.rate = mw._parse_expression("5 Hz")
+
+    # reads are every 200 ms instead of every 200 ms + read time
+    intervals = np.diff(asyncio.run(sample(drifting, 10, clock)))
+    assert intervals == pytest.approx([0.25] * 9)
+    intervals = np.diff(asyncio.run(sample(fixed, 10, clock)))
+    assert intervals == pytest.approx([0.2] * 9)
+    assert fixed._late_samples == fixed._missed_samples == 0
+
+
+def test_data_file(tmp_path):
+    data_file = tmp_path / "data.jsonl"
+    E = P.execute(confirm=True, dry_run=True, log_file=None, data_file=data_file)
+
+    lines = [json.loads(line) for line in data_file.read_text().splitlines()]
+    assert len(lines) == sum(len(datapoints) for datapoints in E.data.values())
+    assert {line["device"] for line in lines} == set(E.data)
+    assert all(line["unit"] == "Dimensionless" for line in lines)
+
+
+class SlowToConnect(mw.DummyPump):
+    def __init__(self, name, serial_port=None, fail=False):
+        super().__init__(name=name)
+        self.serial_port = serial_port
+        self.fail = fail
+        self.log = []
+
+    def __enter__(self):
+        time.sleep(0.2)
+        if self.fail:
+            raise RuntimeError("no response")
+        self.log.append(("enter", time.time()))
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.log.append(("exit", time.time()))
+
+
+def test_concurrent_connection():
+    from mechwolf.core.execute import enter_contexts, exit_contexts
+
+    pumps = [
+        SlowToConnect(name="pump on COM1", serial_port="COM1"),
+        SlowToConnect(name="pump on COM2", serial_port="COM2"),
+        SlowToConnect(name="other pump on COM2", serial_port="COM2"),
+        SlowToConnect(name="usb pump"),
+    ]
+
+    async def connect_and_disconnect():
+        start = time.time()
+        entered = await enter_contexts(pumps)
+        await exit_contexts(entered)
+        return time.time() - start
+
+    # the two COM2 pumps take turns, but everything else is concurrent
+    assert asyncio.run(connect_and_disconnect()) < 0.6
+    assert [event for event, _ in pumps[1].log] == ["enter", "exit"]
+    assert pumps[1].log[0][1] < pumps[2].log[0][1]  # entered in order
+    assert pumps[2].log[1][1] < pumps[1].log[1][1]  # exited in reverse
+
+    # a failure disconnects everything else
+    for pump in pumps:
+        pump.log.clear()
+    broken = SlowToConnect(name="broken pump", fail=True)
+    with pytest.raises(RuntimeError, match="no response"):
+        asyncio.run(enter_contexts(pumps + [broken]))
+    assert all([event for event, _ in pump.log] == ["enter", "exit"] for pump in pumps)
+
+
+class CountingPump(mw.DummyPump):
+    def __init__(self, name, broken=False):
+        super().__init__(name=name)
+        self.broken = broken
+        self.connections = 0
+
+    def __enter__(self):
+        self.connections += 1
+        return self
+
+    async def _update(self):
+        if self.broken:
+            raise RuntimeError("pump is on fire")
+
+
+class CheckedPump(CountingPump):
+    def _validate(self, dry_run):
+        if not dry_run and self.broken:
+            raise ValueError("pump is unplugged")
+        super()._validate(dry_run)
+
+
+def test_validation_reuses_connections():
+    pumps = [CountingPump(name="counting pump"), CountingPump(name="other pump")]
+    B = mw.Apparatus()
+    B.add(a, pumps, tube)
+    P = mw.Protocol(B, name="validation")
+    P.add(pumps, rate="5 mL/min", duration="0.1 secs")
+
+    P.execute(confirm=True, dry_run=False, log_file=None, data_file=None)
+    assert [pump.connections for pump in pumps] == [1, 1]
+
+    pumps[1].broken = True
+    with pytest.raises(RuntimeError, match="pump is on fire"):
+        P.execute(confirm=True, dry_run=False, log_file=None, data_file=None)
+
+    # overrides of _validate() still run their own checks for real runs
+    pump = CheckedPump(name="checked pump", broken=True)
+    B.add(a, pump, tube)
+    P = mw.Protocol(B, name="checked")
+    P.add(pump, rate="5 mL/min", duration="0.1 secs")
+    P.execute(confirm=True, dry_run=True, log_file=None, data_file=None)
+    with pytest.raises(RuntimeError, match="pump is unplugged"):
+        P.execute(confirm=True, dry_run=False, log_file=None, data_file=None)
+    assert pump.connections == 0
@@ -0,0 +1,43 @@
+import numpy as np
+
+import mechwolf as mw
+from mechwolf.core.data import Datapoint, SensorData
+from mechwolf.core.experiment import Experiment, _decimate
+
+
+def test_decimate():
+    x = np.arange(10_000, dtype=float)
+    y = np.sin(x / 100)
+    y[1234] = 5  # a spike that every-nth-point sampling would miss
+
+    decimated_x, decimated_y = _decimate(x, y, 100)
+    assert len(decimated_x) <= 200
+    assert np.all(np.diff(decimated_x) > 0)  # still in order
+    assert decimated_y.max() == 5
+    assert decimated_y.min() == y.min()
+
+    # short series are left alone
+    assert len(_decimate(x[:150], y[:150], 100)[0]) == 150
+
+
+def test_new_plot_points():
+    A = mw.Apparatus()
+    A.add(
+        mw.Vessel("water"),
+        mw.DummySensor(name="sensor"),
+        mw.Tube("1 foot", "1/16 in", "2/16 in", "PVC"),
+    )
+    E = Experiment(mw.Protocol(A, name="plots"))
+    E._plot_max_points_per_frame = 100
+    E.data["sensor"] = SensorData(Datapoint(i, i, float(i)) for i in range(1000))
+
+    assert E._new_plot_points("sensor", 995) == {
+        "timestamps": [995.0, 996.0, 997.0, 998.0, 999.0],
+        "datapoints": [995, 996, 997, 998, 999],
+    }
+    assert len(E._new_plot_points("sensor", 0)["timestamps"]) <= 100
+
+    # no views of the data are left behind, so appending doesn't copy the columns
+    timestamps = E.data["sensor"].timestamps
+    E.data["sensor"].append(Datapoint(1000, 1000, 1000.0))
+    assert E.data["sensor"].timestamps is timestamps
@@ -0,0 +1,186 @@
+import asyncio
+import threading
+
+import aioserial
+import pytest
+
+from mechwolf.components.contrib.fc203 import GilsonFC203
+from mechwolf.components.contrib.gsioc import GsiocBus, GsiocInterface
+from mechwolf.components.contrib.varian import VarianPump
+from tests.gsioc_loopback import LoopbackSerial
+
+
+@pytest.fixture
+def bus(monkeypatch):
+    monkeypatch.setattr(aioserial, "AioSerial", LoopbackSerial)
+    monkeypatch.setattr(LoopbackSerial, "buses", {})
+    monkeypatch.setattr(GsiocBus, "_buses", {})
+    yield LoopbackSerial(port="loopback")._bus
+
+    # stop the buses' threads
+    for gsioc_bus in list(GsiocBus._buses.values()):
+        gsioc_bus._users = 1
+        gsioc_bus.close()
+
+
+def test_session(bus):
+    pump = GsiocInterface(serial_port="loopback", unit_id=1)
+    assert str(pump) == "GsiocInterface 1 on port loopback"
+
+    # the handshake only happens when switching units
+    pump.buffered_command("L")
+    asyncio.run(pump.buffered_command_async("X000100"))
+    assert pump.immediate_command("%") == "%"
+    assert bus["selections"] == 1
+
+    collector = GsiocInterface(serial_port="loopback", unit_id=2)
+    collector.buffered_command("T001")
+    assert not pump.connected
+    pump.buffered_command("X000000")
+    assert bus["selections"] == 3
+    assert bus["commands"] == [
+        (1, "L"),
+        (1, "X000100"),
+        (2, "T001"),
+        (1, "X000000"),
+    ]
+
+
+def test_reconnect(bus):
+    pump = GsiocInterface(serial_port="loopback", unit_id=1)
+    pump.buffered_command("L")
+
+    # the device forgets that it was selected, e.g. after being power cycled
+    bus["selected"] = None
+    pump.buffered_command("X000100")
+    bus["selected"] = None
+    assert asyncio.run(pump.immediate_command_async("%")) == "%"
+    assert bus["commands"] == [(1, "L"), (1, "X000100")]
+    assert pump.connected
+
+
+def test_shared_bus(bus):
+    pump = GsiocInterface(serial_port="loopback", unit_id=1)
+    collector = GsiocInterface(serial_port="loopback", unit_id=2)
+    assert pump._bus is collector._bus
+
+    # keep the bus busy, so that the commands below pile up in its queue
+    started, done = threading.Event(), threading.Event()
+
+    def busy():
+        started.set()
+        done.wait()
+
+    blocker = threading.Thread(target=pump._bus.submit_sync, args=(0x81, busy))
+    blocker.start()
+    started.wait()
+
+    async def interleaved_commands():
+        commands = asyncio.gather(
+            *[
+                interface.buffered_command_async(f"W{i}")
+                for i in range(3)
+                for interface in [pump, collector]
+            ]
+        )
+        await asyncio.sleep(0)  # let them all be submitted
+        done.set()
+        await commands
+
+    # the waiting commands are grouped by unit, each unit's in order
+    asyncio.run(interleaved_commands())
+    blocker.join()
+    assert bus["commands"] == [(1, "W0"), (1, "W1"), (1, "W2")] + [
+        (2, "W0"),
+        (2, "W1"),
+        (2, "W2"),
+    ]
+    metrics = pump._bus.metrics
+    assert metrics["commands"] == 7
+    assert metrics["unit_switches"] == 2
+    assert metrics["queue_depth"] == 0
+    assert 0 < metrics["mean_latency"] <= metrics["max_latency"]
+
+    # the bus works from a new event loop too
+    asyncio.run(collector.buffered_command_async("W3"))
+    assert bus["commands"][-1] == (2, "W3")
+
+    # the bus stays open until all of its interfaces are closed
+    pump.close()
+    assert GsiocBus._buses == {"loopback": collector._bus}
+    collector.close()
+    assert GsiocBus._buses == {}
+
+
+class SlowSerial(LoopbackSerial):
+    """Yields to the event loop while waiting for each read, like a real port."""
+
+    async def read_async(self, size=1):
+        await asyncio.sleep(0.001)
+        return self.read(size)
+
+
+def test_sync_command_in_event_loop(bus, monkeypatch):
+    monkeypatch.setattr(aioserial, "AioSerial", SlowSerial)
+    pump = GsiocInterface(serial_port="loopback", unit_id=1)
+    collector = GsiocInterface(serial_port="loopback", unit_id=2)
+
+    async def mixed_commands():
+        command = asyncio.ensure_future(pump.buffered_command_async("X000100"))
+        await asyncio.sleep(0.002)  # the command is now waiting on a read
+
+        # blocks this event loop, but not the bus, which finishes the first command
+        collector.buffered_command("T001")
+        await command
+
+    asyncio.run(mixed_commands())
+    assert bus["commands"] == [(1, "X000100"), (2, "T001")]
+
+
+class GarbledSerial(LoopbackSerial):
+    """Garbles the echo of the first command sent in one piece."""
+
+    garbled = False
+
+    def read(self, size=1):
+        echo = super().read(size)
+        if size > 1 and not GarbledSerial.garbled:
+            GarbledSerial.garbled = True
+            return echo[:-2] + b"?"
+        return echo
+
+
+def test_block_mode(bus, monkeypatch):
+    pump = GsiocInterface(serial_port="loopback", unit_id=1)
+
+    # the whole command is written at once
+    pump.buffered_command("X000100")
+    writes = bus["writes"]
+    asyncio.run(pump.buffered_command_async("X000200"))
+    assert bus["writes"] - writes == 2  # the '\n' and the command
+    pump.buffered_command("X000300", block_mode=False)
+    assert bus["writes"] - writes == 2 + 1 + len("X000300\r")
+    assert bus["commands"][-3:] == [(1, "X000100"), (1, "X000200"), (1, "X000300")]
+
+    # a bad echo falls back to sending one character at a time
+    pump.close()
+    monkeypatch.setattr(aioserial, "AioSerial", GarbledSerial)
+    collector = GsiocInterface(serial_port="loopback", unit_id=2)
+    collector.buffered_command("T005")
+    assert GarbledSerial.garbled
+    assert bus["commands"][-1] == (2, "T005")
+
+
+def test_failed_shutdown_closes_bus(bus):
+    def fail(command, block_mode=True):
+        raise IOError("No response")
+
+    for device in [
+        VarianPump(serial_port="loopback", max_rate="10 mL/min", unit_id=1),
+        GilsonFC203(serial_port="loopback", unit_id=2),
+    ]:
+        device.__enter__()
+        device._gsioc.buffered_command = fail
+        with pytest.raises(IOError):
+            device.__exit__(None, None, None)
+        assert GsiocBus._buses == {}
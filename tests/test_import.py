@@ -0,0 +1,32 @@
+import subprocess
+import sys
+
+# only needed for visualizations and notebooks
+HEAVY_MODULES = [
+    "altair",
+    "bokeh",
+    "graphviz",
+    "IPython",
+    "ipywidgets",
+    "pandas",
+    "pkg_resources",
+    "terminaltables",
+    "yaml",
+]
+
+
+def test_lazy_imports():
+    # a fresh interpreter, so that other tests' imports don't count
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import mechwolf"],
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+    imported = {
+        line.rsplit("|", 1)[-1].strip()
+        for line in result.stderr.splitlines()
+        if line.startswith("import time:")
+    }
+    assert "mechwolf" in imported
+    assert not imported.intersection(HEAVY_MODULES)
@@ -0,0 +1,136 @@
+import asyncio
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import mechwolf as mw
+from mechwolf.components.contrib.labjack import LabJack
+
+
+class FakeU3(object):
+    """A fake `u3.U3` that records which threads it's called from."""
+
+    def __init__(self, batches=()):
+        self.batches = list(batches)
+        self.threads = set()
+        self.calls = []
+
+    def getAIN(self, positive_channel, negative_channel):
+        self.threads.add(threading.current_thread())
+        time.sleep(0.1)  # a slow USB transaction
+        return 1.5
+
+    def streamConfig(self, **kwargs):
+        self.calls.append(("streamConfig", kwargs))
+
+    def streamStart(self):
+        self.calls.append(("streamStart",))
+
+    def streamStop(self):
+        self.calls.append(("streamStop",))
+
+    def streamData(self):
+        while True:
+            self.threads.add(threading.current_thread())
+            time.sleep(0.01)
+            yield self.batches.pop(0) if self.batches else None
+
+    def configIO(self, **kwargs):
+        self.threads.add(threading.current_thread())
+
+    def close(self):
+        self.threads.add(threading.current_thread())
+
+
+def test_read_in_executor():
+    device = FakeU3()
+    sensor = LabJack()
+    sensor.device = device
+
+    async def read_while_ticking():
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker = asyncio.ensure_future(tick())
+        results = [await sensor._read(), await sensor._read()]
+        ticker.cancel()
+        await sensor.__aexit__(None, None, None)
+        return results, ticks
+
+    results, ticks = asyncio.run(read_while_ticking())
+    assert results == [1.5, 1.5]
+
+    # the event loop kept running during the reads
+    assert ticks > 10
+
+    # the reads happened on one worker thread, which was stopped on exit
+    assert len(device.threads) == 1 and threading.main_thread() not in device.threads
+    assert sensor._executor is None
+
+
+def test_connect_in_executor(monkeypatch):
+    device = FakeU3()
+    monkeypatch.setitem(sys.modules, "u3", SimpleNamespace(U3=lambda: device))
+    sensor = LabJack()
+
+    async def connect_and_read():
+        async with sensor:
+            return await sensor._read()
+
+    assert asyncio.run(connect_and_read()) == 1.5
+
+    # connecting, reading and closing all happened on the sensor's worker thread
+    assert len(device.threads) == 1 and threading.main_thread() not in device.threads
+    assert sensor._executor is None
+
+
+def test_streaming():
+    device = FakeU3(
+        batches=[
+            dict(errors=0, missed=0, AIN0=[0.1, 0.2, 0.3]),
+            dict(errors=0, missed=2, AIN0=[0.6]),
+        ]
+    )
+    sensor = LabJack(streaming=True)
+    sensor.device = device
+    sensor.rate = mw._parse_expression("1 kHz")
+
+    async def collect():
+        experiment = SimpleNamespace(_end_loop=False, _end_loop_event=asyncio.Event())
+
+        async def stop():
+            await asyncio.sleep(0.2)
+            experiment._end_loop = True
+            experiment._end_loop_event.set()
+
+        stopper = asyncio.ensure_future(stop())
+        results = [result async for result in sensor._monitor(experiment)]
+        await stopper
+        await sensor.__aexit__(None, None, None)
+        return results
+
+    results = asyncio.run(collect())
+    assert [x["data"] for x in results] == [0.1, 0.2, 0.3, 0.6]
+
+    # samples are timestamped from the stream's clock, including missed ones
+    elapsed = [x["timestamp"] - results[0]["timestamp"] for x in results]
+    assert elapsed == pytest.approx([0, 0.001, 0.002, 0.005], abs=1e-6)
+    assert sensor._missed_samples == 2
+
+    assert device.calls == [
+        (
+            "streamConfig",
+            dict(NumChannels=1, PChannels=[0], NChannels=[1], ScanFrequency=1000),
+        ),
+        ("streamStart",),
+        ("streamStop",),
+    ]
+    assert len(device.threads) == 1 and threading.main_thread() not in device.threads
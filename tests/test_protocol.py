@@ -1,4 +1,5 @@
 import json
+import warnings
 from datetime import timedelta
 
 import pytest
@@ -16,8 +17,11 @@ A.add(pump1, pump2, tube)
 def test_create_protocol():
     # test naming
     assert mw.Protocol(A, name="testing").name == "testing"
-    assert mw.Protocol(A).name == "Protocol_0"
-    assert mw.Protocol(A).name == "Protocol_1"
+
+    # unnamed protocols are numbered, counting those made by other tests
+    n = mw.Protocol._id_counter
+    assert mw.Protocol(A).name == f"Protocol_{n}"
+    assert mw.Protocol(A).name == f"Protocol_{n + 1}"
 
 
 def test_add():
@@ -126,6 +130,17 @@ def test_add_valve():
     with pytest.raises(ValueError):
         P.add(bad_valve, setting=3)
 
+    # reassigning the mapping rebuilds its indexes
+    valve.mapping = {pump1: 2, pump2: 3}
+    P.procedures = []
+    P.add(valve, setting="pump2")
+    P.add(valve, setting=2, start="1 sec")
+    assert [p["params"]["setting"] for p in P.procedures] == [3, 2]
+    assert valve._mapping_indexes()[1][2] is pump1
+
+    with pytest.raises(TypeError):
+        valve.mapping = [pump1, pump2]
+
 
 def test_compile():
     P = mw.Protocol(A)
@@ -177,6 +192,63 @@ def test_switching_rates():
     }
 
 
+def test_compile_interleaved_procedures():
+    # procedures added out of order and interleaved between components
+    P = mw.Protocol(A)
+    P.add(pump1, rate="5 mL/min", start="5 min", stop="10 min")
+    P.add(pump2, rate="10 mL/min", duration="5 min")
+    P.add(pump1, rate="10 mL/min", duration="5 min")
+    assert P._compile() == {
+        pump1: [
+            {"params": {"rate": "10 mL/min"}, "time": 0},
+            {"params": {"rate": "5 mL/min"}, "time": 300},
+            {"params": {"rate": "0 mL/min"}, "time": 600},
+        ],
+        pump2: [
+            {"params": {"rate": "10 mL/min"}, "time": 0},
+            {"params": {"rate": "0 mL/min"}, "time": 300},
+        ],
+    }
+
+
+def test_compile_cache():
+    P = mw.Protocol(A)
+    P.add(pump1, rate="10 mL/min", duration="5 min")
+    with pytest.warns(UserWarning, match="not used"):
+        compiled = P._compile()
+
+    # an unchanged protocol reuses the compilation without re-warning
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        assert P._compile() is compiled
+
+    # modifying the protocol invalidates the cache
+    P.add(pump2, rate="10 mL/min", duration="5 min")
+    assert P._compile() is not compiled
+    assert pump2 in P._compile()
+
+    P.procedures = []
+    P.add(pump1, rate="5 mL/min", duration="5 min")
+    assert P._compile()[pump1][0]["params"] == {"rate": "5 mL/min"}
+
+
+def test_compile_resolved_params():
+    P = mw.Protocol(A)
+    P.add(pump1, rate="10 mL/min", duration="5 min")
+    compiled = P._compile(_resolve=True)[pump1]
+    assert compiled[0]["params"] == {"rate": "10 mL/min"}
+    assert compiled[0]["resolved_params"] == {
+        "rate": mw._ureg.parse_expression("10 mL/min")
+    }
+    assert compiled[1]["resolved_params"] == {
+        "rate": mw._ureg.parse_expression("0 mL/min")
+    }
+
+    # the resolved params are the values the component will be set to
+    with pytest.raises(ValueError):
+        pump1._resolve_params({"rate": "10 mL"})
+
+
 def test_overlapping_procedures():
     P = mw.Protocol(A)
     P.add(pump1, start="0 seconds", stop="5 seconds", rate="5 mL/min")
@@ -216,3 +288,129 @@ def test_yaml():
     P = mw.Protocol(A)
     P.add([pump1, pump2], rate="10 mL/min", duration="5 min")
     assert yaml.safe_load(P.yaml()) == json.loads(P.json())
+
+
+def test_from_list():
+    A = mw.Apparatus()
+    valve = mw.Valve(name="valve", mapping={pump1: 1, pump2: 2})
+    A.add([pump1, pump2], valve, tube)
+
+    P = mw.Protocol(A)
+    P.add(pump1, rate="10 mL/min", duration="5 min")
+    P.add(pump2, rate="5 mL/min", start="1 min", stop="2 min")
+    P.add(valve, setting="pump2", start="30 s", stop="1 min")
+
+    # round trips
+    for loaded in [
+        mw.Protocol.from_list(A, P.to_list()),
+        mw.Protocol.from_json(A, P.json()),
+        mw.Protocol.from_yaml(A, P.yaml()),
+        mw.Protocol.from_dict(A, dict(name="loaded", procedures=P.to_list())),
+    ]:
+        assert loaded.procedures == P.procedures
+        assert loaded._compile() == P._compile()
+    assert mw.Protocol.from_yaml(A, "{name: loaded, procedures: []}").name == "loaded"
+
+    # valve settings, times with units, and components instead of names
+    P = mw.Protocol.from_list(
+        A,
+        [
+            dict(component="valve", params={"setting": "pump1"}, start="1 min"),
+            dict(component=pump1, params={"rate": "1 mL/min"}, stop=timedelta(0, 60)),
+        ],
+    )
+    assert P.procedures == [
+        dict(start=60, stop=None, component=valve, params={"setting": 1}),
+        dict(start=0, stop=60, component=pump1, params={"rate": "1 mL/min"}),
+    ]
+
+    # nothing is added if any of the procedures are invalid
+    for invalid, error in [
+        (dict(component="pump3", params={"rate": "1 mL/min"}), KeyError),
+        (dict(component="pump1", params={"rate": "1 mL"}), ValueError),
+        (dict(component="pump1", params={}), RuntimeError),
+        (dict(component="valve", params={"setting": 3}), ValueError),
+        (
+            dict(component="pump1", params={"rate": "1 mL/min"}, start=2, stop=1),
+            ValueError,
+        ),
+    ]:
+        with pytest.raises(error):
+            P._add_procedures(
+                [dict(component="pump2", params={"rate": "0 mL/min"}), invalid]
+            )
+        assert len(P.procedures) == 2
+
+
+def test_add_many(monkeypatch):
+    import pandas as pd
+
+    A = mw.Apparatus()
+    valve = mw.Valve(name="valve", mapping={pump1: 1, pump2: 2})
+    A.add([pump1, pump2], valve, tube)
+
+    expected = mw.Protocol(A)
+    expected.add(pump1, rate="5 mL/min", start="1 min", stop="2 min")
+    expected.add(pump2, rate="1 L/h", stop="30 seconds")
+    expected.add(valve, setting="pump2", start="30 s", stop="1 min")
+
+    # tuples and mappings
+    P = mw.Protocol(A)
+    P.add_many(
+        [
+            (pump1, "1 min", timedelta(minutes=2), {"rate": "5 mL/min"}),
+            ("pump2", None, 30, {"rate": "1 L/h"}),
+            dict(component="valve", start=30.0, stop=60, params={"setting": pump2}),
+        ]
+    )
+    assert P.procedures == expected.procedures
+
+    # a DataFrame with a params column
+    P = mw.Protocol(A)
+    P.add_many(
+        pd.DataFrame(
+            dict(
+                component=["pump1", "pump2", "valve"],
+                start=pd.to_timedelta([60, 0, 30], unit="s"),
+                stop=[120, 30, 60],
+                params=[{"rate": "5 mL/min"}, {"rate": "1 L/h"}, {"setting": 2}],
+            )
+        )
+    )
+    assert P.procedures == expected.procedures
+
+    # one column per param, with missing values where they don't apply
+    P = mw.Protocol(A)
+    P.add_many(
+        pd.DataFrame(
+            dict(
+                component=[pump1, pump2, valve],
+                start=["1 min", None, "30 s"],
+                stop=["2 min", "30 s", "1 min"],
+                rate=["5 mL/min", "1 L/h", None],
+                setting=[None, None, "pump2"],
+            )
+        )
+    )
+    assert P.procedures == expected.procedures
+
+    # quantities are only checked once per unit
+    checked = []
+    check = mw.Protocol._check_component_kwargs
+
+    def counting_check(self, component, **kwargs):
+        checked.append(kwargs)
+        return check(self, component, **kwargs)
+
+    monkeypatch.setattr(mw.Protocol, "_check_component_kwargs", counting_check)
+    P = mw.Protocol(A)
+    P.add_many(
+        (pump1, i, i + 1, {"rate": f"{i} mL/min" if i % 2 else f"{i} L/h"})
+        for i in range(100)
+    )
+    assert len(P.procedures) == 100
+    assert checked == [{"rate": "0 L/h"}, {"rate": "1 mL/min"}]
+
+    with pytest.raises(ValueError):
+        P.add_many([(pump1, 0, 1, {"rate": "5 mL"})])
+    assert len(P.procedures) == 100
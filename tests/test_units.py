@@ -0,0 +1,17 @@
+import mechwolf as mw
+
+
+def test_parse_expression_cache():
+    mw._parse_expression.cache_clear()
+    assert mw._parse_expression("5 mL/min") == mw._ureg.parse_expression("5 mL/min")
+    mw._parse_expression("5 mL/min")
+    info = mw._parse_expression.cache_info()
+    assert info.hits == 1
+    assert info.misses == 1
+
+
+def test_parse_expression_copies():
+    # modifying a parsed quantity must not leak into the cache
+    rate = mw._parse_expression("5 mL/min")
+    rate.ito("mL/s")
+    assert mw._parse_expression("5 mL/min").units == mw._ureg.parse_units("mL/min")